@@ -1,24 +1,28 @@
-from flask import Flask, render_template, request, session, redirect, url_for, jsonify
-from collections import Counter
+from flask import Flask, Response, render_template, request, session, redirect, url_for, jsonify
 import os
-import json
-import re
+import hashlib
 import random
-import traceback
+import secrets
 from datetime import datetime
 
-import gspread
-from google.oauth2.service_account import Credentials
-
 from config import config
+from session_store import init_session
+from sheets import SHEETS, configure_sheets
+from metrics import METRICS, SCORING_SECONDS, init_metrics
+from profiling import init_profiling
+from template_cache import init_template_cache
+from assets import init_assets
+from write_behind import create_write_behind_queue
+from outbox import create_outbox_queue
+from live_updates import ScoreBroker, event_stream
+from scoring import (
+    score_answers, apply_answer, identify_tie_pairs, sort_pairs_resolver_style,
+    get_questions_for_pairs, normalize_pair, next_tie_breaker, remaining_questions,
+    code_locked, resolve_riasec_code,
+)
+from enrichment import PROFILE_CACHE, profile_enrichment
 from questions.main_questions import QUESTIONS
-from questions.tie_breaker_questions import TIE_BREAKER_QUESTIONS
-
-# -----------------------------
-# Google Sheets config
-# -----------------------------
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-SHEET_NAME = "R1"
+from questions.bank import QUESTION_BANK, QUESTIONS_BY_NUMBER, MAIN_TOTAL, NEW_APTITUDES, RIASEC_ORDER
 
 # -----------------------------
 # Create App
@@ -31,62 +35,53 @@ def create_app():
     # SIMPLE STABLE SECRET KEY
     app.secret_key = os.environ.get("SECRET_KEY", "123")
 
+    init_session(app)
+    configure_sheets(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_assets(app)
+    init_template_cache(app, QUESTIONS_BY_NUMBER, [
+        (qnum, 'main' if qnum <= MAIN_TOTAL else 'tie_breaker') for qnum in QUESTIONS_BY_NUMBER
+    ])
+
     return app
 
 app = create_app()
 
-# -----------------------------
-# Load Google SA Key From ENV
-# -----------------------------
-def get_gspread_client():
-    """
-    Loads the Google Service Account KEY from environment variable GCP_SA_KEY.
-    GCP_SA_KEY must contain FULL minified JSON (one line).
-    """
-    raw = os.environ.get("GCP_SA_KEY")
-    if not raw:
-        raise RuntimeError("ERROR: GCP_SA_KEY environment variable missing.")
-
-    try:
-        info = json.loads(raw)
-    except Exception as e:
-        raise RuntimeError(f"GCP_SA_KEY JSON parse failed: {e}")
-
-    try:
-        creds = Credentials.from_service_account_info(info, scopes=SCOPE)
-        client = gspread.authorize(creds)
-        return client
-    except Exception as e:
-        tb = traceback.format_exc()
-        raise RuntimeError(f"Failed to initialize Google credentials: {e}\n{tb}")
-
-# -----------------------------
-# Aptitudes & Mapping
-# -----------------------------
-NEW_APTITUDES = [
-    "Logical Reasoning", "Mechanical", "Creative", "Verbal Communication",
-    "Numerical", "Social/Helping", "Leadership/Persuasion", "Digital/Computer",
-    "Organizing/Structuring", "Writing/Expression", "Scientific", "Spatial/Design"
-]
-
-OLD_TO_NEW_APT_MAP = {
-    "Analytical": ["Logical Reasoning"],
-    "Technical": ["Mechanical"],
-    "Spatial": ["Spatial/Design"],
-    "Verbal": ["Verbal Communication"],
-    "Creative": ["Creative"],
-}
-
-KEYWORD_TO_APTS = {
-    r"mechanic|machin|tool|repair|operate|equipment|assembly": ["Mechanical", "Spatial/Design"],
-    r"design|creative|art|visual|graphic|illustrat|style|compose": ["Creative", "Writing/Expression", "Spatial/Design"],
-    r"analy|research|study|evaluate|experiment|data|statistic": ["Logical Reasoning", "Scientific", "Numerical"],
-    r"teach|help|support|counsel|mentor|coach": ["Social/Helping", "Verbal Communication"],
-    r"lead|manage|supervis|coordinate|direct|influence|persuad": ["Leadership/Persuasion", "Organizing/Structuring"],
-    r"software|digital|computer|it|program|code|data entry|excel": ["Digital/Computer", "Organizing/Structuring"],
-    r"write|document|report|communicat|present": ["Writing/Expression", "Verbal Communication"],
-    r"budget|finance|cost|account|number|math|calculate": ["Numerical"],
-}
+QUESTION_FRAGMENTS = app.extensions['question_fragments']
+
+PROFILE_CACHE.maxsize = app.config.get('PROFILE_ENRICHMENT_CACHE_SIZE', 4096)
+
+LIVE_SCORES = ScoreBroker(
+    app.extensions.get('session_store'),
+    ttl=app.permanent_session_lifetime.total_seconds(),
+    poll_interval=app.config.get('LIVE_SCORES_POLL_INTERVAL', 1.0),
+    max_poll_interval=app.config.get('LIVE_SCORES_MAX_POLL_INTERVAL', 10.0),
+)
+
+if app.config.get('SHEETS_OUTBOX'):
+    RESULTS_QUEUE = create_outbox_queue(app, SHEETS.append_rows)
+elif app.config.get('SHEETS_WRITE_BEHIND'):
+    RESULTS_QUEUE = create_write_behind_queue(app, SHEETS.append_rows)
+else:
+    RESULTS_QUEUE = None
+
+METRICS.gauge('riasec_results_queue_depth', 'Result rows not yet written to Sheets.',
+              lambda: RESULTS_QUEUE.depth() if RESULTS_QUEUE is not None else None)
+METRICS.gauge('riasec_sheets_worksheet_opens', 'Worksheet handles opened by this process.',
+              lambda: SHEETS.misses)
+METRICS.gauge('riasec_sheets_reopens', 'Cached Sheets handles dropped after auth/not-found errors.',
+              lambda: SHEETS.reopens)
+MAIN_QUESTIONS_SKIPPED = METRICS.counter(
+    'riasec_main_questions_skipped_total', 'Main questions skipped because the code was already locked.')
+METRICS.gauge('riasec_profile_cache_hits', 'Occupation/education enrichment cache hits.',
+              lambda: PROFILE_CACHE.hits)
+METRICS.gauge('riasec_profile_cache_misses', 'Occupation/education enrichment cache misses.',
+              lambda: PROFILE_CACHE.misses)
+METRICS.gauge('riasec_question_fragment_hits', 'Question cards served from the fragment cache.',
+              lambda: QUESTION_FRAGMENTS.hits)
+METRICS.gauge('riasec_profile_cache_entries', 'Texts held in the enrichment cache.',
+              lambda: len(PROFILE_CACHE))
 
 # -----------------------------
 # Session Initialization
@@ -95,119 +90,233 @@ def initialize_session():
     session['current_question'] = 1
     session['answers'] = {}
     session['riasec_scores'] = {'R':0,'I':0,'A':0,'S':0,'E':0,'C':0}
+    session['aptitude_scores'] = list(session.get('profile_aptitudes') or [0] * len(NEW_APTITUDES))
     session['tie_breaker_phase'] = False
     session['tie_breaker_questions'] = []
     session['tie_breaker_pairs_asked'] = []
+    session['tie_breaker_pending'] = []
     session['tie_breaker_answered'] = 0
-    session['shuffled_questions'] = random.sample(QUESTIONS, len(QUESTIONS))
+    # Only question numbers live in the cookie; content comes from the bank
+    session['question_order'] = random.sample([q['number'] for q in QUESTIONS], len(QUESTIONS))
     session['total_questions'] = len(QUESTIONS)
+    session['live_channel'] = secrets.token_urlsafe(16)
+    session['score_version'] = 0
+
+def upgrade_legacy_session():
+    """
+    Converts sessions that still carry full question dicts to number lists.
+    """
+    if 'shuffled_questions' in session:
+        session['question_order'] = [q['number'] for q in session.pop('shuffled_questions')]
+        session['tie_breaker_questions'] = [
+            q['number'] if isinstance(q, dict) else q
+            for q in session.get('tie_breaker_questions', [])
+        ]
 
 # -----------------------------
-# Score Calculation
+# Score Calculation (session adapters)
 # -----------------------------
-def enrich_from_text(text):
-    boosts = Counter()
-    if not text or not isinstance(text, str):
-        return boosts
-    txt = text.lower()
-    for patt, apt_list in KEYWORD_TO_APTS.items():
-        if re.search(patt, txt):
-            for a in apt_list:
-                boosts[a] += 1
-    return boosts
-
 def calculate_scores(use_text_enrichment=False):
-    riasec_scores = {'R':0,'I':0,'A':0,'S':0,'E':0,'C':0}
-    aptitude_scores = Counter({a: 0 for a in NEW_APTITUDES})
-    main_total = len(QUESTIONS)
+    with SCORING_SECONDS.time(enrichment=bool(use_text_enrichment)):
+        riasec_scores, aptitude_vector = score_answers(session.get('answers', {}), use_text_enrichment)
+    for i, boost in enumerate(session.get('profile_aptitudes') or ()):
+        aptitude_vector[i] += boost
+    return riasec_scores, dict(zip(NEW_APTITUDES, aptitude_vector))
 
-    for qnum_key, selected in session.get('answers', {}).items():
-        try:
-            qnum = int(qnum_key)
-        except:
-            continue
+def current_scores():
+    """
+    Returns the running totals maintained by /save_answer.
+    Sessions started before totals were tracked fall back to a full rescore.
+    """
+    if 'aptitude_scores' not in session:
+        return calculate_scores()
+    return dict(session['riasec_scores']), dict(zip(NEW_APTITUDES, session['aptitude_scores']))
 
-        if qnum <= main_total:
-            question = next((q for q in QUESTIONS if q['number'] == qnum), None)
-        else:
-            question = next((q for q in TIE_BREAKER_QUESTIONS if q['number'] == qnum), None)
+# -----------------------------
+# Assessment Flow
+# -----------------------------
+def record_answers(submitted):
+    """
+    Stores (question_number, option_letter) pairs, applies their deltas to
+    the running totals and publishes the new totals once.
+    """
+    answers = session['answers']
+
+    if 'aptitude_scores' in session:
+        riasec_scores = session['riasec_scores']
+        aptitude_vector = session['aptitude_scores']
+        for qnum, ans in submitted:
+            apply_answer(riasec_scores, aptitude_vector, qnum, answers.get(str(qnum)), ans)
+            answers[str(qnum)] = ans
+    else:
+        for qnum, ans in submitted:
+            answers[str(qnum)] = ans
+        riasec_scores, aptitude_vector = score_answers(answers)
 
-        if not question or selected not in question.get('options', {}):
-            continue
+    session['answers'] = answers
+    session['riasec_scores'] = riasec_scores
+    session['aptitude_scores'] = aptitude_vector
+    session['score_version'] = session.get('score_version', 0) + 1
+
+    if 'live_channel' in session:
+        LIVE_SCORES.publish(
+            session['live_channel'],
+            session['score_version'],
+            live_scores_payload(riasec_scores, dict(zip(NEW_APTITUDES, aptitude_vector)))
+        )
 
-        option = question['options'][selected]
-        q_weight = question.get('weight', 1)
-
-        # RIASEC scoring
-        riasec_code = option.get('riasec')
-        if riasec_code in riasec_scores:
-            riasec_scores[riasec_code] += q_weight
-
-        # Aptitude scoring
-        if qnum <= main_total:
-            option_apts = option.get('aptitudes', {}) or {}
-            for old_key, score in option_apts.items():
-                if old_key in OLD_TO_NEW_APT_MAP:
-                    for new_key in OLD_TO_NEW_APT_MAP[old_key]:
-                        aptitude_scores[new_key] += int(score) * q_weight
-                else:
-                    if old_key in NEW_APTITUDES:
-                        aptitude_scores[old_key] += int(score) * q_weight
-
-            if use_text_enrichment:
-                for field in ('explain','hint','job_text'):
-                    if field in question:
-                        boosts = enrich_from_text(question[field])
-                        for k,v in boosts.items():
-                            aptitude_scores[k] += v
-
-    return riasec_scores, dict(aptitude_scores)
+def settle_main_phase():
+    """
+    Adaptive mode: once no answers to the remaining main questions can
+    change the code or call for tie-breakers, trims question_order to the questions already answered
+    so the flow moves on to tie-breakers or results. Returns True if trimmed.
+    """
+    if not app.config.get('MAIN_PHASE_ADAPTIVE') or session.get('tie_breaker_phase'):
+        return False
+    answers = session['answers']
+    order = session['question_order']
+    remaining = [n for n in order if str(n) not in answers]
+    riasec_scores, _ = current_scores()
+    if not remaining or not code_locked(
+        riasec_scores, remaining,
+        delta=app.config.get('TIE_BREAKER_DELTA', 2),
+        depth=app.config.get('TIE_BREAKER_DEPTH', 3),
+    ):
+        return False
+
+    session['question_order'] = [n for n in order if str(n) in answers]
+    session['total_questions'] = len(session['question_order'])
+    session['main_questions_skipped'] = session.get('main_questions_skipped', 0) + len(remaining)
+    MAIN_QUESTIONS_SKIPPED.inc(len(remaining))
+    return True
 
-# -----------------------------
-# Tie-breaker Logic
-# -----------------------------
-MAX_TIE_BREAKER_QS = 3
-RIASEC_ORDER = ['R','I','A','S','E','C']
-
-def sort_pairs_resolver_style(pairs):
-    def key_func(pair):
-        a, b = pair.split('-')
-        return (RIASEC_ORDER.index(a), RIASEC_ORDER.index(b))
-    return sorted(pairs, key=key_func)
-
-def identify_tie_pairs(riasec_scores):
-    sorted_scores = sorted(
-        riasec_scores.items(),
-        key=lambda x: (-x[1], RIASEC_ORDER.index(x[0]))
+def begin_tie_breakers():
+    """
+    Queues tie-breaker questions for near-tied top pairs not asked yet.
+    Returns False when no tie-breakers are needed.
+    """
+    riasec_scores,_ = current_scores()
+    pairs_needed = identify_tie_pairs(
+        riasec_scores,
+        delta=app.config.get('TIE_BREAKER_DELTA', 2),
+        depth=app.config.get('TIE_BREAKER_DEPTH', 3),
     )
 
-    pairs = set()
-    top1, score1 = sorted_scores[0]
-    top2, score2 = sorted_scores[1]
+    already = {normalize_pair(p) for p in session.get('tie_breaker_pairs_asked', [])}
+    remaining = pairs_needed - already
+
+    if not remaining:
+        return False
 
-    if abs(score1 - score2) < 2:
-        pairs.add(f"{min(top1, top2)}-{max(top1, top2)}")
+    sorted_pairs = sort_pairs_resolver_style(remaining)
 
-    if len(sorted_scores) > 2:
-        top3, score3 = sorted_scores[2]
-        if abs(score2 - score3) < 2:
-            pairs.add(f"{min(top2, top3)}-{max(top2, top3)}")
+    if app.config.get('TIE_BREAKER_ADAPTIVE'):
+        qnum, pending = next_tie_breaker(riasec_scores, sorted_pairs, [])
+        if qnum is None:
+            return False
+        session['tie_breaker_pending'] = pending
+        new_numbers = [qnum]
+    else:
+        new_numbers = [q['number'] for q in get_questions_for_pairs(sorted_pairs, already)]
 
-    return pairs
+    session['tie_breaker_phase'] = True
+    session['tie_breaker_pairs_asked'] = session.get('tie_breaker_pairs_asked', []) + sorted_pairs
+    session['tie_breaker_questions'] = new_numbers
+    session['tie_breaker_answered'] = 0
+    session['total_questions'] = tie_breaker_total(new_numbers)
+    return True
 
-def get_questions_for_pairs(pairs, already_asked):
-    new_qs = []
-    for pair in pairs:
-        if pair in already_asked:
-            continue
-        matched = [q for q in TIE_BREAKER_QUESTIONS if q.get('pair') == pair]
-        new_qs.extend(matched[:MAX_TIE_BREAKER_QS])
-    return new_qs
+def tie_breaker_total(numbers):
+    """
+    Progress total during tie-breakers. In adaptive mode this is an upper
+    bound that shrinks as pairs get settled.
+    """
+    asked = set(numbers)
+    pending = session.get('tie_breaker_pending', []) if app.config.get('TIE_BREAKER_ADAPTIVE') else []
+    upcoming = sum(len(remaining_questions(p, asked)) for p in pending)
+    return len(session['question_order']) + len(numbers) + upcoming
+
+def extend_tie_breakers():
+    """
+    Adaptive mode: once every queued tie-breaker is answered, queues the
+    next one, or none if the code can no longer change.
+    """
+    if not (app.config.get('TIE_BREAKER_ADAPTIVE') and session.get('tie_breaker_phase')):
+        return
+    numbers = session.get('tie_breaker_questions', [])
+    if any(str(n) not in session['answers'] for n in numbers):
+        return
+
+    riasec_scores, _ = current_scores()
+    qnum, pending = next_tie_breaker(riasec_scores, session.get('tie_breaker_pending', []), numbers)
+    session['tie_breaker_pending'] = pending
+    if qnum is not None:
+        numbers = numbers + [qnum]
+        session['tie_breaker_questions'] = numbers
+    session['total_questions'] = tie_breaker_total(numbers)
+
+def question_payload(qnum):
+    """
+    Client-side view of a question: text and options, no scoring data.
+    """
+    q = QUESTIONS_BY_NUMBER[qnum]
+    return {
+        'number': q['number'],
+        'question': q['question'],
+        'options': {
+            key: {'text': option['text'], 'riasec': option.get('riasec')}
+            for key, option in q['options'].items()
+        },
+    }
 
+def single_page_mode():
+    if request.args.get('mode') == 'single_page':
+        session['single_page'] = True
+    return app.config.get('SINGLE_PAGE_ASSESSMENT') or session.get('single_page', False)
+
+def phase_payload():
+    """
+    Everything the single-page assessment needs for the current phase:
+    the remaining questions in order plus progress counters.
+    """
+    answers = session.get('answers', {})
+    tie_phase = session.get('tie_breaker_phase', False)
+    numbers = session['tie_breaker_questions'] if tie_phase else session['question_order']
+    remaining = [n for n in numbers if str(n) not in answers]
+    return {
+        'success': True,
+        'phase': 'tie_breaker' if tie_phase else 'main',
+        'questions': [question_payload(n) for n in remaining],
+        'answered': len(session['question_order']) + len(numbers) - len(remaining)
+                    if tie_phase else len(numbers) - len(remaining),
+        'total_questions': session.get('total_questions', len(numbers)),
+        'scores': live_scores_payload(*current_scores()),
+    }
+
+def advance_single_page():
+    """
+    Returns the current phase's payload, starting tie-breakers once the main
+    phase is fully answered and marking the assessment done after that.
+    """
+    payload = phase_payload()
+    if not payload['questions'] and not session.get('tie_breaker_phase', False) and begin_tie_breakers():
+        payload = phase_payload()
+    if not payload['questions']:
+        payload['done'] = True
+        payload['redirect'] = url_for('submit_all_answers')
+    return payload
 
 # -----------------------------
 # Routes
 # -----------------------------
+@app.before_request
+def before_request():
+    if request.endpoint in ('static', 'asset'):
+        # Assets never use the session; reading it here would mark it
+        # accessed and add Vary: Cookie to responses shared caches should hold
+        return
+    upgrade_legacy_session()
+
 @app.route('/')
 def index():
     return redirect(url_for('basic_info'))
@@ -223,6 +332,11 @@ def save_basic_info():
         'occupation': request.form.get('occupation', ''),
         'education': request.form.get('education', '')
     }
+    session.pop('profile_aptitudes', None)
+    if app.config.get('PROFILE_ENRICHMENT'):
+        boosts = profile_enrichment(session['user_info'])
+        if any(boosts):
+            session['profile_aptitudes'] = list(boosts)
     initialize_session()
     return redirect(url_for('assessment'))
 
@@ -232,35 +346,33 @@ def assessment():
     if 'user_info' not in session:
         return redirect(url_for('basic_info'))
 
+    if single_page_mode():
+        payload = advance_single_page()
+        if request.args.get('format') == 'json':
+            return jsonify(payload)
+        if payload.get('done'):
+            return redirect(payload['redirect'])
+        return render_template(
+            'assessment_spa.html',
+            payload=payload,
+            batch_size=app.config.get('SINGLE_PAGE_BATCH_SIZE', 5),
+            flush_interval=app.config.get('SINGLE_PAGE_FLUSH_SECONDS', 10)
+        )
+
     if not session.get('tie_breaker_phase', False):
 
-        if session['current_question'] <= len(session['shuffled_questions']):
-            q = session['shuffled_questions'][session['current_question'] - 1]
+        if session['current_question'] <= len(session['question_order']):
+            q = QUESTIONS_BY_NUMBER[session['question_order'][session['current_question'] - 1]]
             return render_template(
                 'assessment.html',
                 question=q,
+                question_card=QUESTION_FRAGMENTS.get(q['number'], "main"),
                 phase="main",
-                total_questions=len(session['shuffled_questions']),
+                total_questions=len(session['question_order']),
                 current_question=session['current_question']
             )
 
-        riasec_scores,_ = calculate_scores()
-        pairs_needed = identify_tie_pairs(riasec_scores)
-
-        already = set(session.get('tie_breaker_pairs_asked', []))
-        remaining = pairs_needed - already
-
-        if remaining:
-            session['tie_breaker_phase'] = True
-            sorted_pairs = sort_pairs_resolver_style(remaining)
-
-            session['tie_breaker_pairs_asked'].extend(sorted_pairs)
-            new_qs = get_questions_for_pairs(sorted_pairs, already)
-
-            session['tie_breaker_questions'] = new_qs
-            session['tie_breaker_answered'] = 0
-            session['total_questions'] = len(session['shuffled_questions']) + len(new_qs)
-
+        if begin_tie_breakers():
             return redirect(url_for('assessment'))
 
         return redirect(url_for('submit_all_answers'))
@@ -270,11 +382,12 @@ def assessment():
     answered = session.get('tie_breaker_answered', 0)
 
     if answered < len(tie_qs):
-        q = tie_qs[answered]
-        display_idx = len(session['shuffled_questions']) + answered + 1
+        q = QUESTIONS_BY_NUMBER[tie_qs[answered]]
+        display_idx = len(session['question_order']) + answered + 1
         return render_template(
             'assessment.html',
             question=q,
+            question_card=QUESTION_FRAGMENTS.get(q['number'], "tie_breaker"),
             phase="tie_breaker",
             total_questions=session.get('total_questions'),
             current_question=display_idx
@@ -295,22 +408,113 @@ def save_answer():
     if qnum is None or ans is None:
         return jsonify({'success': False, 'msg': 'Missing question data'}), 400
 
-    session['answers'][str(qnum)] = ans
+    record_answers([(qnum, ans)])
 
     if not session.get('tie_breaker_phase', False):
         session['current_question'] += 1
+        if settle_main_phase():
+            session['current_question'] = len(session['question_order']) + 1
     else:
+        extend_tie_breakers()
         session['tie_breaker_answered'] += 1
         session['current_question'] = (
-            len(session['shuffled_questions']) +
+            len(session['question_order']) +
             session['tie_breaker_answered'] + 1
         )
 
-    riasec_scores, _ = calculate_scores()
-    session['riasec_scores'] = riasec_scores
-
     return jsonify({'success': True, 'redirect': url_for('assessment')})
 
+@app.route('/save_answers', methods=['POST'])
+def save_answers():
+
+    if 'current_question' not in session:
+        return jsonify({'success': False, 'msg': 'Session missing'}), 401
+
+    data = request.get_json(force=True, silent=True) or {}
+    submitted = data.get('answers')
+    if not isinstance(submitted, list):
+        return jsonify({'success': False, 'msg': 'Missing answers'}), 400
+
+    tie_phase = session.get('tie_breaker_phase', False)
+    allowed = set(session['tie_breaker_questions'] if tie_phase else session['question_order'])
+    answers = session['answers']
+
+    batch = []
+    for item in submitted:
+        try:
+            qnum = int(item.get('question_number'))
+            ans = item.get('answer')
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({'success': False, 'msg': 'Missing question data'}), 400
+
+        # Retried batches may repeat answers the server already has
+        if answers.get(str(qnum)) == ans:
+            continue
+        if qnum not in allowed or not isinstance(ans, str) or ans not in QUESTION_BANK[qnum]:
+            return jsonify({'success': False, 'msg': f'Invalid answer for question {qnum}'}), 400
+        batch.append((qnum, ans))
+
+    if batch:
+        record_answers(batch)
+
+    if tie_phase:
+        extend_tie_breakers()
+        allowed = session['tie_breaker_questions']
+    elif settle_main_phase():
+        allowed = session['question_order']
+    answered = sum(1 for n in allowed if str(n) in session['answers'])
+    if not tie_phase:
+        session['current_question'] = answered + 1
+    else:
+        session['tie_breaker_answered'] = answered
+        session['current_question'] = len(session['question_order']) + answered + 1
+
+    return jsonify(advance_single_page())
+
+def live_scores_payload(riasec_scores, aptitude_scores):
+    return {
+        'success': True,
+        'top_riasec': sorted(riasec_scores.items(), key=lambda x:x[1], reverse=True)[:3],
+        'top_aptitudes': sorted(aptitude_scores.items(), key=lambda x:x[1], reverse=True)[:3],
+    }
+
+@app.route('/get_live_scores')
+def get_live_scores():
+    if 'answers' not in session:
+        return jsonify({'success': False, 'msg': 'Session missing'}), 401
+
+    response = jsonify(live_scores_payload(*current_scores()))
+
+    # Polls between answers see identical totals and get an empty 304
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/live_scores/stream')
+def live_scores_stream():
+    if 'live_channel' not in session:
+        return jsonify({'success': False, 'msg': 'Session missing'}), 401
+
+    channel = session['live_channel']
+    version = session.get('score_version', 0)
+    payload = live_scores_payload(*current_scores())
+
+    # A reconnecting EventSource already has the totals it last saw
+    if request.headers.get('Last-Event-ID') == str(version):
+        payload = None
+
+    response = Response(
+        event_stream(
+            LIVE_SCORES, channel, version, payload,
+            max_seconds=app.config.get('LIVE_SCORES_STREAM_SECONDS', 55)
+        ),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/submit_all_answers')
 def submit_all_answers():
     if not session.get('answers'):
@@ -318,30 +522,11 @@ def submit_all_answers():
     return redirect(url_for('results'))
 
 
-# -----------------------------
-# RIASEC Resolver
-# -----------------------------
-def resolve_riasec_code(riasec_scores):
-    sorted_scores = sorted(
-        riasec_scores.items(),
-        key=lambda x: (-x[1], RIASEC_ORDER.index(x[0]))
-    )
-    top3 = [code for code, score in sorted_scores[:3]]
-    return ''.join(top3)
-
-
 # -----------------------------
 # SAVE RESULTS (Google Sheet)
 # -----------------------------
 def save_to_google_sheet(riasec_code, riasec_scores, aptitude_scores, user_info=None):
 
-    client = get_gspread_client()
-
-    try:
-        sheet = client.open(SHEET_NAME).sheet1
-    except Exception as e:
-        raise RuntimeError(f"Failed to open Google Sheet: {e}")
-
     row = []
     row.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
     row.append(user_info.get('name', 'Anonymous'))
@@ -353,16 +538,13 @@ def save_to_google_sheet(riasec_code, riasec_scores, aptitude_scores, user_info=
     for code in RIASEC_ORDER:
         row.append(riasec_scores.get(code, 0))
 
-    ordered_apts = [
-        "Logical Reasoning", "Mechanical", "Creative", "Verbal Communication",
-        "Numerical", "Social/Helping", "Leadership/Persuasion", "Digital/Computer",
-        "Organizing/Structuring", "Writing/Expression", "Scientific", "Spatial/Design"
-    ]
-
-    for apt in ordered_apts:
+    for apt in NEW_APTITUDES:
         row.append(aptitude_scores.get(apt, 0))
 
-    sheet.append_row(row)
+    if RESULTS_QUEUE is not None:
+        RESULTS_QUEUE.enqueue(row)
+    else:
+        SHEETS.append_row(row)
     return True
 
 # -----------------------------
@@ -373,7 +555,18 @@ def results():
     if not session.get('answers'):
         return redirect(url_for('index'))
 
-    riasec_scores, aptitude_scores = calculate_scores()
+    riasec_scores, aptitude_scores = current_scores()
+
+    if app.debug:
+        # Consistency check of the incremental totals against a full rescore
+        full_riasec, full_aptitudes = calculate_scores()
+        if (full_riasec, full_aptitudes) != (riasec_scores, aptitude_scores):
+            app.logger.warning(
+                "Incremental scores drifted from full rescore: %s/%s vs %s/%s",
+                riasec_scores, aptitude_scores, full_riasec, full_aptitudes
+            )
+            riasec_scores, aptitude_scores = full_riasec, full_aptitudes
+
     riasec_code = resolve_riasec_code(riasec_scores)
 
     session['last_riasec_code'] = riasec_code
@@ -407,6 +600,15 @@ def save_results():
     except Exception as e:
         return jsonify({'success': False, 'msg': str(e)})
 
+@app.route('/status')
+def status():
+    return jsonify({
+        'sheets_client': SHEETS.stats(),
+        'results_queue': RESULTS_QUEUE.stats() if RESULTS_QUEUE is not None else None,
+        'profile_enrichment_cache': PROFILE_CACHE.stats(),
+        'question_fragments': QUESTION_FRAGMENTS.stats(),
+    })
+
 @app.route('/restart')
 def restart():
     session.clear()
@@ -0,0 +1,216 @@
+"""
+Fingerprinted static assets and response compression.
+
+init_assets(app) hashes every file under the static folder at startup and
+serves it at /assets/<name>.<hash>.<ext> with a far-future immutable
+Cache-Control, so a browser downloads each stylesheet and script once per
+release and a changed file gets a new URL. Templates link them with
+
+    {{ asset_url('css/assessment.css') }}
+
+gzip variants (and brotli ones when the brotli package is installed) are
+compressed once at startup and picked by Accept-Encoding. With ASSETS_WATCH
+on, changed files are re-hashed whenever a page links an asset.
+
+    python assets.py build dist/
+
+writes the same fingerprinted and precompressed files plus a manifest.json
+for a CDN or an nginx gzip_static / brotli_static location in front of the
+app.
+
+With COMPRESS_RESPONSES on, dynamic HTML and JSON responses of at least
+COMPRESS_MIN_BYTES are gzipped for clients that accept it.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+
+from flask import abort, request, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+COMPRESSED_RESPONSE_TYPES = ('text/html', 'application/json')
+
+
+def fingerprint_name(path, digest):
+    root, ext = os.path.splitext(path)
+    return f'{root}.{digest}{ext}'
+
+def compress_variants(data, mimetype):
+    """
+    Returns {content_encoding: bytes}; only variants smaller than the
+    original are kept.
+    """
+    variants = {}
+    if not mimetype.startswith(COMPRESSIBLE_TYPES):
+        return variants
+    encoded = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(data, quality=11)
+    for encoding, body in encoded.items():
+        if len(body) < len(data):
+            variants[encoding] = body
+    return variants
+
+
+class Asset:
+    def __init__(self, path, data, mtime):
+        self.path = path
+        self.mtime = mtime
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        self.name = fingerprint_name(path, self.digest)
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.variants = compress_variants(data, self.mimetype)
+        self.variants[None] = data
+
+    def negotiate(self, accept_encodings):
+        """
+        Picks the smallest variant the client accepts.
+        Returns (content_encoding or None, body).
+        """
+        best = None
+        for encoding, body in self.variants.items():
+            if encoding is not None and not accept_encodings[encoding]:
+                continue
+            if best is None or len(body) < len(best[1]):
+                best = (encoding, body)
+        return best
+
+
+class AssetManifest:
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.by_path = {}
+        self.by_name = {}
+        self.refresh()
+
+    def scan(self):
+        for root, _, files in os.walk(self.directory):
+            for filename in sorted(files):
+                full = os.path.join(root, filename)
+                yield os.path.relpath(full, self.directory).replace(os.sep, '/'), full
+
+    def refresh(self):
+        """
+        Re-hashes files that were added or changed since the last scan.
+        """
+        by_path = {}
+        for path, full in self.scan():
+            mtime = os.stat(full).st_mtime_ns
+            asset = self.by_path.get(path)
+            if asset is None or asset.mtime != mtime:
+                with open(full, 'rb') as f:
+                    asset = Asset(path, f.read(), mtime)
+            by_path[path] = asset
+        with self._lock:
+            self.by_path = by_path
+            self.by_name = {asset.name: asset for asset in by_path.values()}
+
+    def url_name(self, path):
+        asset = self.by_path.get(path)
+        return asset.name if asset is not None else None
+
+    def lookup(self, name):
+        return self.by_name.get(name)
+
+    def manifest(self):
+        return {path: asset.name for path, asset in sorted(self.by_path.items())}
+
+    def build(self, out_dir):
+        """
+        Writes every asset under its fingerprinted name with .gz / .br
+        siblings, plus manifest.json. Returns the number of assets written.
+        """
+        suffixes = {None: '', 'gzip': '.gz', 'br': '.br'}
+        for asset in self.by_path.values():
+            target = os.path.join(out_dir, asset.name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            for encoding, body in asset.variants.items():
+                with open(target + suffixes[encoding], 'wb') as f:
+                    f.write(body)
+        with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+            json.dump(self.manifest(), f, indent=2)
+        return len(self.by_path)
+
+# -----------------------------
+# Flask Integration
+# -----------------------------
+def compress_response(response, min_bytes=500, level=6):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not response.mimetype.startswith(COMPRESSED_RESPONSE_TYPES)):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=level))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def init_assets(app):
+    manifest = AssetManifest(app.static_folder)
+    max_age = app.config.get('ASSETS_MAX_AGE', ASSET_MAX_AGE)
+    # Re-hashing walks the static folder on every asset_url(); opt-in only
+    watch = app.config.get('ASSETS_WATCH', False)
+
+    def asset_url(path):
+        if watch:
+            manifest.refresh()
+        name = manifest.url_name(path)
+        if name is None:
+            return url_for('static', filename=path)
+        return url_for('asset', filename=name)
+
+    app.add_template_global(asset_url)
+
+    @app.route('/assets/<path:filename>')
+    def asset(filename):
+        found = manifest.lookup(filename)
+        if found is None:
+            abort(404)
+        encoding, body = found.negotiate(request.accept_encodings)
+        response = app.response_class(body, mimetype=found.mimetype)
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+        response.set_etag(f'{found.digest}-{encoding or "identity"}')
+        return response.make_conditional(request)
+
+    if app.config.get('COMPRESS_RESPONSES', False):
+        min_bytes = app.config.get('COMPRESS_MIN_BYTES', 500)
+        level = app.config.get('COMPRESS_LEVEL', 6)
+        app.after_request(lambda response: compress_response(response, min_bytes, level))
+
+    app.extensions['assets'] = manifest
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write fingerprinted, precompressed static assets.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build = subcommands.add_parser('build')
+    build.add_argument('out_dir')
+    build.add_argument('--static', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    args = parser.parse_args(argv)
+
+    count = AssetManifest(args.static).build(args.out_dir)
+    print(f"Wrote {count} assets to {args.out_dir}" + ('' if brotli else " (brotli not installed: gzip only)"))
+
+if __name__ == '__main__':
+    main()
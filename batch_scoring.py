@@ -0,0 +1,171 @@
+"""
+Compact answer encoding and a vectorized batch scorer.
+
+Every question in the bank is a two-option A/B choice, so a respondent is
+encoded as four integers: a choice mask and an answered mask for the main
+questions, and the same pair for the tie-breakers. Bit i of a choice mask is
+set when slot i was answered "B". Re-scoring an archive after a weight change
+is then a couple of matrix products over an (n, 4) uint64 array.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from questions.bank import (
+    QUESTION_BANK, MAIN_TOTAL, RIASEC_ORDER, RIASEC_INDEX, NEW_APTITUDES,
+)
+from enrichment import QUESTION_ENRICHMENT
+
+OPTION_LETTERS = ('A', 'B')
+MASK_BITS = 64
+CHUNK_SIZE = 65536
+
+# Column layout of an encoded response array
+MAIN_CHOICES, MAIN_ANSWERED, TIE_CHOICES, TIE_ANSWERED = range(4)
+
+ScoreMatrices = namedtuple(
+    'ScoreMatrices', ['main_slots', 'tie_slots', 'main_a', 'main_b', 'tie_a', 'tie_b']
+)
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def answer_slots(bank=QUESTION_BANK):
+    """
+    Returns (main_slots, tie_slots): question numbers in bit order.
+    """
+    main_slots = sorted(q for q in bank if q <= MAIN_TOTAL)
+    tie_slots = sorted(q for q in bank if q > MAIN_TOTAL)
+
+    for qnum in main_slots + tie_slots:
+        if tuple(sorted(bank[qnum])) != OPTION_LETTERS:
+            raise ValueError(f"Question {qnum} is not an A/B choice and cannot be bit-encoded")
+    if len(main_slots) > MASK_BITS or len(tie_slots) > MASK_BITS:
+        raise ValueError("Question bank does not fit in a 64-bit answer mask")
+
+    return main_slots, tie_slots
+
+MAIN_SLOTS, TIE_SLOTS = answer_slots()
+SLOT_INDEX = {qnum: i for i, qnum in enumerate(MAIN_SLOTS)}
+SLOT_INDEX.update({qnum: i for i, qnum in enumerate(TIE_SLOTS)})
+
+def encode_answers(answers):
+    """
+    Encodes a {question_number: option_letter} mapping as
+    (main_choices, main_answered, tie_choices, tie_answered).
+    Unknown questions and letters are dropped, as the scorer would ignore them.
+    """
+    encoded = [0, 0, 0, 0]
+    for qnum_key, selected in answers.items():
+        try:
+            qnum = int(qnum_key)
+        except:
+            continue
+        if qnum not in SLOT_INDEX or selected not in OPTION_LETTERS:
+            continue
+
+        bit = 1 << SLOT_INDEX[qnum]
+        base = MAIN_CHOICES if qnum <= MAIN_TOTAL else TIE_CHOICES
+        encoded[base + 1] |= bit
+        if selected == 'B':
+            encoded[base] |= bit
+    return tuple(encoded)
+
+def decode_answers(encoded):
+    answers = {}
+    for slots, base in ((MAIN_SLOTS, MAIN_CHOICES), (TIE_SLOTS, TIE_CHOICES)):
+        choices, answered = int(encoded[base]), int(encoded[base + 1])
+        for i, qnum in enumerate(slots):
+            if answered >> i & 1:
+                answers[str(qnum)] = 'B' if choices >> i & 1 else 'A'
+    return answers
+
+def encode_many(answer_sets):
+    """
+    Encodes an iterable of answer mappings into an (n, 4) uint64 array.
+    """
+    rows = [encode_answers(answers) for answers in answer_sets]
+    return np.array(rows, dtype=np.uint64).reshape(-1, 4)
+
+# -----------------------------
+# Score Matrices
+# -----------------------------
+def option_row(option):
+    row = np.zeros(len(RIASEC_ORDER) + len(NEW_APTITUDES), dtype=np.int64)
+    if option.riasec:
+        row[RIASEC_INDEX[option.riasec]] = option.riasec_delta
+    row[len(RIASEC_ORDER):] = option.aptitudes
+    return row
+
+def build_score_matrices(bank=QUESTION_BANK, use_text_enrichment=False):
+    """
+    Lays the bank out as per-slot delta matrices: one row per slot, RIASEC
+    columns first, then NEW_APTITUDES. Text boosts do not depend on the
+    option picked, so they are folded into both the A and B rows.
+    Call again with the updated bank whenever a weight changes.
+    """
+    main_slots, tie_slots = answer_slots(bank)
+
+    def layout(slots):
+        a = np.stack([option_row(bank[q]['A']) for q in slots])
+        b = np.stack([option_row(bank[q]['B']) for q in slots])
+        if use_text_enrichment:
+            for i, qnum in enumerate(slots):
+                boosts = QUESTION_ENRICHMENT.get(qnum)
+                if qnum <= MAIN_TOTAL and boosts is not None:
+                    a[i, len(RIASEC_ORDER):] += boosts
+                    b[i, len(RIASEC_ORDER):] += boosts
+        return a, b
+
+    main_a, main_b = layout(main_slots)
+    tie_a, tie_b = layout(tie_slots)
+    return ScoreMatrices(main_slots, tie_slots, main_a, main_b, tie_a, tie_b)
+
+DEFAULT_MATRICES = build_score_matrices()
+
+# -----------------------------
+# Batch Scoring
+# -----------------------------
+def unpack_bits(column, width):
+    shifts = np.arange(width, dtype=np.uint64)
+    return ((column[:, None] >> shifts) & np.uint64(1)).astype(np.int64)
+
+def resolve_codes(riasec):
+    """
+    Vectorized resolve_riasec_code: top three by score, ties broken by
+    RIASEC order (a stable sort keeps the lower column first).
+    """
+    order = np.argsort(-riasec, axis=1, kind='stable')[:, :3]
+    letters = np.array(RIASEC_ORDER)[order]
+    return np.char.add(np.char.add(letters[:, 0], letters[:, 1]), letters[:, 2])
+
+def score_chunk(encoded, matrices):
+    totals = np.zeros((len(encoded), matrices.main_a.shape[1]), dtype=np.int64)
+    for base, a, b in ((MAIN_CHOICES, matrices.main_a, matrices.main_b),
+                       (TIE_CHOICES, matrices.tie_a, matrices.tie_b)):
+        width = a.shape[0]
+        choices = unpack_bits(encoded[:, base], width)
+        answered = unpack_bits(encoded[:, base + 1], width)
+        totals += (answered - choices * answered) @ a
+        totals += (choices * answered) @ b
+    return totals
+
+def score_batch(encoded, matrices=None, use_text_enrichment=False, chunk_size=CHUNK_SIZE):
+    """
+    Scores an (n, 4) uint64 array of encoded responses.
+    Returns (riasec (n, 6), aptitudes (n, 12), codes (n,)) with columns in
+    RIASEC_ORDER and NEW_APTITUDES order.
+    """
+    if matrices is None:
+        matrices = (build_score_matrices(use_text_enrichment=True)
+                    if use_text_enrichment else DEFAULT_MATRICES)
+
+    encoded = np.asarray(encoded, dtype=np.uint64).reshape(-1, 4)
+    totals = np.empty((len(encoded), matrices.main_a.shape[1]), dtype=np.int64)
+    for start in range(0, len(encoded), chunk_size):
+        stop = start + chunk_size
+        totals[start:stop] = score_chunk(encoded[start:stop], matrices)
+
+    riasec = totals[:, :len(RIASEC_ORDER)]
+    aptitudes = totals[:, len(RIASEC_ORDER):]
+    return riasec, aptitudes, resolve_codes(riasec)
@@ -0,0 +1,295 @@
+"""
+Synthetic load generator: full respondent journeys at a fixed concurrency.
+
+    python -m benchmarks.loadgen --respondents 500 --concurrency 32
+    python -m benchmarks.loadgen --url http://localhost:8080 --concurrency 64
+
+Each simulated respondent posts /save_basic_info, renders /assessment and
+posts /save_answer for every question (tie-breakers included when they are
+triggered), then loads /results and posts /save_results. Answers follow a
+per-respondent preference over the six RIASEC dimensions drawn from a
+Dirichlet(--spread) distribution: small values give decided respondents and
+few ties, large values near-random answers and many ties.
+
+Without --url the app runs in-process (Flask test client, one thread per
+concurrent respondent) with SHEETS_BACKEND=fake, whose latency and quota
+errors are set from the command line. With --url the target server's own
+Sheets configuration applies; start it with SHEETS_BACKEND=fake (see
+fake_sheets.py) to keep Google out of the run.
+
+Prints a JSON report: p50/p95/p99 latency per route, throughput, and the
+observed tie-breaker rate.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from questions.bank import QUESTION_BANK, MAIN_TOTAL, RIASEC_ORDER
+
+QUESTION_NUMBER_RE = re.compile(r'currentQuestionNumber = (\d+)|data-question-number="(\d+)"')
+
+# -----------------------------
+# Transports
+# -----------------------------
+class LocalClient:
+    """
+    Flask test client with the same small surface as RemoteClient.
+    """
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, **kwargs):
+        response = self.client.open(path, method=method, **kwargs)
+        return response.status_code, response.get_data(as_text=True), response.headers.get('Location')
+
+
+class RemoteClient:
+    def __init__(self, base_url, timeout=30):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def request(self, method, path, **kwargs):
+        response = self.session.request(
+            method, self.base_url + path, allow_redirects=False, timeout=self.timeout, **kwargs
+        )
+        return response.status_code, response.text, response.headers.get('Location')
+
+# -----------------------------
+# Respondents
+# -----------------------------
+def respondent_preferences(rnd, spread):
+    weights = [rnd.gammavariate(spread, 1.0) for _ in RIASEC_ORDER]
+    total = sum(weights) or 1.0
+    return {code: w / total for code, w in zip(RIASEC_ORDER, weights)}
+
+def choose_answer(rnd, qnum, preferences, noise):
+    options = QUESTION_BANK.get(qnum, {})
+    if 'A' not in options or 'B' not in options or rnd.random() < noise:
+        return rnd.choice('AB')
+    weight_a = preferences.get(options['A'].riasec, 0.0)
+    weight_b = preferences.get(options['B'].riasec, 0.0)
+    if weight_a + weight_b <= 0:
+        return rnd.choice('AB')
+    return 'A' if rnd.random() < weight_a / (weight_a + weight_b) else 'B'
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, client, method, path, expect=(200, 302), **kwargs):
+        route = f"{method} {path.split('?')[0]}"
+        started = time.perf_counter()
+        try:
+            status, body, location = client.request(method, path, **kwargs)
+        except Exception:
+            status, body, location = None, '', None
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.timings[route].append(elapsed)
+            if status not in expect:
+                self.errors[route] += 1
+        return status, body, location
+
+
+def run_journey(client, recorder, rnd, args):
+    """
+    One respondent from basic info to saved results.
+    Returns (questions answered, tie-breaker questions answered, completed).
+    """
+    preferences = respondent_preferences(rnd, args.spread)
+    recorder.call(client, 'POST', '/save_basic_info', data={
+        'name': f'Load {rnd.randrange(10 ** 6)}',
+        'occupation': rnd.choice(['student', 'software engineer', 'teacher', 'accountant', '']),
+        'education': rnd.choice(['High School', 'BSc', 'MA', '']),
+    })
+
+    answered = tie_breakers = 0
+    while answered <= args.max_questions:
+        status, body, location = recorder.call(client, 'GET', '/assessment')
+        if status == 302 and (location or '').endswith('/assessment'):
+            # Tie-breakers were just queued
+            continue
+        if status != 200:
+            break
+        match = QUESTION_NUMBER_RE.search(body)
+        if match is None:
+            return answered, tie_breakers, False
+        qnum = int(match.group(1) or match.group(2))
+        if args.think_time:
+            time.sleep(rnd.uniform(0, 2 * args.think_time))
+        recorder.call(client, 'POST', '/save_answer', json={
+            'question_number': qnum,
+            'answer': choose_answer(rnd, qnum, preferences, args.noise),
+        })
+        answered += 1
+        tie_breakers += qnum > MAIN_TOTAL
+
+    recorder.call(client, 'GET', '/submit_all_answers')
+    status, _, _ = recorder.call(client, 'GET', '/results', expect=(200,))
+    if status != 200:
+        return answered, tie_breakers, False
+    status, body, _ = recorder.call(client, 'POST', '/save_results', expect=(200,))
+    saved = status == 200 and json.loads(body or '{}').get('success', False)
+    return answered, tie_breakers, saved
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def route_report(recorder):
+    report = {}
+    for route, values in sorted(recorder.timings.items()):
+        values = sorted(values)
+        report[route] = {
+            'count': len(values),
+            'errors': recorder.errors.get(route, 0),
+            'p50_ms': round(percentile(values, 50) * 1000, 3),
+            'p95_ms': round(percentile(values, 95) * 1000, 3),
+            'p99_ms': round(percentile(values, 99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3),
+        }
+    return report
+
+def print_summary(report):
+    print(f"{'route':28s} {'count':>7s} {'err':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}",
+          file=sys.stderr)
+    for route, r in report['routes'].items():
+        print(f"{route:28s} {r['count']:>7d} {r['errors']:>5d} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}", file=sys.stderr)
+    t = report['throughput']
+    print(f"{t['respondents_per_s']:.1f} respondents/s, {t['requests_per_s']:.1f} requests/s "
+          f"at concurrency {report['meta']['concurrency']}; "
+          f"tie-breaker rate {report['respondents']['tie_breaker_rate']:.1%}", file=sys.stderr)
+
+# -----------------------------
+# Main
+# -----------------------------
+def local_target(args):
+    """
+    Imports the app configured with SHEETS_BACKEND=fake.
+    Returns (client factory, fake sheets client, results queue).
+    """
+    os.environ.setdefault('SINGLE_PAGE_ASSESSMENT', 'false')
+    os.environ.setdefault('SHEETS_OUTBOX_PATH', os.path.join(
+        tempfile.mkdtemp(prefix='riasec-loadgen-'), 'outbox.sqlite3'
+    ))
+    os.environ.update({
+        'SHEETS_BACKEND': 'fake',
+        'SHEETS_FAKE_LATENCY': str(args.sheets_latency),
+        'SHEETS_FAKE_JITTER': str(args.sheets_jitter),
+        'SHEETS_FAKE_QUOTA_RATE': str(args.sheets_quota_rate),
+        'SHEETS_FAKE_FAILURE_RATE': str(args.sheets_failure_rate),
+    })
+
+    import app as app_module
+
+    fake = app_module.SHEETS.client_factory()
+    return (lambda: LocalClient(app_module.app)), fake, app_module.RESULTS_QUEUE
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent respondent journeys.")
+    parser.add_argument('--url', help="base URL of a running server (default: in-process app)")
+    parser.add_argument('-n', '--respondents', type=int, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="mean seconds a respondent spends per question")
+    parser.add_argument('--spread', type=float, default=1.0,
+                        help="Dirichlet concentration of respondent preferences")
+    parser.add_argument('--noise', type=float, default=0.1,
+                        help="probability of answering at random")
+    parser.add_argument('--max-questions', type=int, default=200,
+                        help="safety stop for a runaway journey")
+    parser.add_argument('--sheets-latency', type=float, default=0.3)
+    parser.add_argument('--sheets-jitter', type=float, default=0.2)
+    parser.add_argument('--sheets-quota-rate', type=float, default=0.05,
+                        help="fraction of Sheets calls that fail with 429")
+    parser.add_argument('--sheets-failure-rate', type=float, default=0.0,
+                        help="fraction of Sheets calls that fail with 500")
+    parser.add_argument('--drain-timeout', type=float, default=60.0,
+                        help="seconds to wait for queued rows to reach the stub")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('-o', '--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    fake = queue = None
+    if args.url:
+        make_client = lambda: RemoteClient(args.url)
+    else:
+        make_client, fake, queue = local_target(args)
+
+    recorder = Recorder()
+    seeds = random.Random(args.seed)
+    journey_seeds = [seeds.randrange(2 ** 32) for _ in range(args.respondents)]
+
+    def journey(seed):
+        return run_journey(make_client(), recorder, random.Random(seed), args)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(journey, journey_seeds))
+    elapsed = time.perf_counter() - started
+
+    drained = None
+    if queue is not None:
+        drained = queue.flush(args.drain_timeout)
+
+    requests_made = sum(len(v) for v in recorder.timings.values())
+    with_ties = sum(1 for _, ties, _ in outcomes if ties)
+    report = {
+        'meta': {
+            'target': args.url or 'in-process',
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'respondents': args.respondents,
+            'concurrency': args.concurrency,
+            'think_time': args.think_time,
+            'spread': args.spread,
+            'noise': args.noise,
+            'seed': args.seed,
+            'duration_s': round(elapsed, 3),
+        },
+        'throughput': {
+            'respondents_per_s': round(args.respondents / elapsed, 3),
+            'requests_per_s': round(requests_made / elapsed, 3),
+        },
+        'respondents': {
+            'completed': sum(1 for _, _, saved in outcomes if saved),
+            'mean_questions': round(sum(a for a, _, _ in outcomes) / max(1, len(outcomes)), 3),
+            'tie_breaker_rate': with_ties / max(1, len(outcomes)),
+            'mean_tie_breakers': round(sum(t for _, t, _ in outcomes) / max(1, len(outcomes)), 3),
+        },
+        'routes': route_report(recorder),
+    }
+    if fake is not None:
+        report['sheets'] = dict(fake.stats(), drained=drained,
+                                queue=queue.stats() if queue is not None else None)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    print_summary(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+"""
+Benchmarks for the assessment hot paths.
+
+    python -m benchmarks.run -o bench.json
+    python -m benchmarks.run --compare bench.json
+    python -m benchmarks.run --check --only tie_breakers
+
+Results are emitted as JSON (per-call timings in microseconds plus a few
+size measurements) so runs from different commits can be diffed;
+--compare prints the ratio against an earlier run and exits non-zero when
+any benchmark got slower than --threshold. --check first runs property
+checks of the optimized code against straightforward reference versions;
+a failing check raises before any timing is done.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime
+
+# Keep benchmark runs self-contained: signed-cookie sessions, no Sheets queue
+os.environ.setdefault('SESSION_TYPE', 'cookie')
+os.environ.setdefault('SHEETS_OUTBOX', 'false')
+os.environ.setdefault('SHEETS_WRITE_BEHIND', 'false')
+
+from questions.main_questions import QUESTIONS
+from questions.tie_breaker_questions import TIE_BREAKER_QUESTIONS
+from questions.bank import RIASEC_ORDER
+from enrichment import enrich_from_text
+import scoring
+
+SAMPLE_TEXTS = [
+    "Software engineer working on data pipelines and statistics dashboards",
+    "Primary school teacher who mentors and coaches new staff",
+    "Mechanical technician who operates and repairs assembly line equipment",
+    "Graphic designer creating visual illustrations for a marketing team",
+    "Accountant managing budgets, cost reports and financial calculations",
+    "Student",
+    "Project manager coordinating research, documentation and presentations",
+]
+
+# -----------------------------
+# Timing Helpers
+# -----------------------------
+def measure(fn, repeat=3, min_time=0.1):
+    """
+    Per-call timings in microseconds: `number` is picked so each of the
+    `repeat` runs lasts at least min_time seconds.
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    runs = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'min_us': round(min(runs), 3),
+        'median_us': round(statistics.median(runs), 3),
+        'mean_us': round(statistics.mean(runs), 3),
+        'calls': number * repeat,
+    }
+
+def random_answers(rnd, count):
+    numbers = [q['number'] for q in QUESTIONS] + [q['number'] for q in TIE_BREAKER_QUESTIONS]
+    chosen = numbers[:count] if count <= len(QUESTIONS) else (
+        numbers[:len(QUESTIONS)] + rnd.sample(numbers[len(QUESTIONS):], count - len(QUESTIONS))
+    )
+    return {str(n): rnd.choice('AB') for n in chosen}
+
+def simulate_session(client, rnd):
+    """
+    Drives one full respondent through the multi-page flow.
+    Returns the number of questions answered.
+    """
+    client.post('/save_basic_info', data={'name': 'Bench', 'occupation': 'engineer', 'education': 'BSc'})
+    asked = 0
+    while True:
+        response = client.get('/assessment')
+        if response.status_code == 302:
+            if 'assessment' in response.headers['Location']:
+                continue
+            break
+        with client.session_transaction() as s:
+            if s.get('tie_breaker_phase'):
+                qnum = s['tie_breaker_questions'][s['tie_breaker_answered']]
+            else:
+                qnum = s['question_order'][s['current_question'] - 1]
+        client.post('/save_answer', json={'question_number': qnum, 'answer': rnd.choice('AB')})
+        asked += 1
+    client.get('/results')
+    return asked
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+def bench_scoring(results, sizes, rnd):
+    from app import app, calculate_scores
+
+    for count in (1, 10, 30, 33, 45):
+        answers = random_answers(rnd, count)
+        results[f'score_answers[{count}]'] = measure(lambda: scoring.score_answers(answers))
+        with app.test_request_context():
+            from flask import session
+            session['answers'] = answers
+            results[f'calculate_scores[{count}]'] = measure(calculate_scores)
+            results[f'calculate_scores_enriched[{count}]'] = measure(lambda: calculate_scores(True))
+
+    riasec = {'R':0,'I':0,'A':0,'S':0,'E':0,'C':0}
+    vector = [0] * 12
+    results['apply_answer'] = measure(
+        lambda: scoring.apply_answer(riasec, vector, 7, 'A', 'B')
+    )
+
+def bench_enrichment(results, sizes, rnd):
+    for i, text in enumerate(SAMPLE_TEXTS):
+        results[f'enrich_from_text[{i}]'] = measure(lambda: enrich_from_text(text))
+    results['enrich_from_text[all]'] = measure(lambda: [enrich_from_text(t) for t in SAMPLE_TEXTS])
+
+def bench_tie_breakers(results, sizes, rnd):
+    score_sets = [
+        {c: rnd.randint(0, 10) for c in 'RIASEC'} for _ in range(200)
+    ]
+    results['identify_tie_pairs[200]'] = measure(
+        lambda: [scoring.identify_tie_pairs(s) for s in score_sets]
+    )
+    results['identify_tie_pairs_depth6[200]'] = measure(
+        lambda: [scoring.identify_tie_pairs(s, depth=6) for s in score_sets]
+    )
+    pair_sets = [scoring.sort_pairs_resolver_style(scoring.identify_tie_pairs(s)) for s in score_sets]
+    results['sort_pairs_resolver_style[200]'] = measure(
+        lambda: [scoring.sort_pairs_resolver_style(p) for p in pair_sets]
+    )
+    results['get_questions_for_pairs[200]'] = measure(
+        lambda: [scoring.get_questions_for_pairs(p, set()) for p in pair_sets]
+    )
+    sizes['tie_breaker_rate[200]'] = sum(1 for p in pair_sets if p) / len(pair_sets)
+
+def bench_batch(results, sizes, rnd):
+    import batch_scoring
+
+    encoded = batch_scoring.encode_many(random_answers(rnd, 30) for _ in range(10000))
+    results['score_batch[10000]'] = measure(lambda: batch_scoring.score_batch(encoded))
+
+def bench_session(results, sizes, rnd):
+    from app import app
+    from flask.sessions import session_json_serializer
+
+    client = app.test_client()
+    simulate_session(client, rnd)
+    with client.session_transaction() as s:
+        data = dict(s)
+
+    serialized = session_json_serializer.dumps(data)
+    sizes['session_json_bytes'] = len(serialized)
+    results['session_json_dumps'] = measure(lambda: session_json_serializer.dumps(data))
+    results['session_json_loads'] = measure(lambda: session_json_serializer.loads(serialized))
+
+    signer = app.session_interface.get_signing_serializer(app) if hasattr(
+        app.session_interface, 'get_signing_serializer') else None
+    if signer is not None:
+        cookie = signer.dumps(data)
+        sizes['session_cookie_bytes'] = len(cookie)
+        results['session_cookie_dumps'] = measure(lambda: signer.dumps(data))
+        results['session_cookie_loads'] = measure(lambda: signer.loads(cookie))
+
+def bench_render(results, sizes, rnd):
+    from app import app, QUESTION_FRAGMENTS
+    from flask import render_template
+
+    question = QUESTIONS[0]
+    riasec, vector = scoring.score_answers(random_answers(rnd, 30))
+    aptitudes = dict(zip(scoring.NEW_APTITUDES, vector))
+
+    with app.test_request_context():
+        results['render[assessment.html]'] = measure(lambda: render_template(
+            'assessment.html', question=question,
+            question_card=QUESTION_FRAGMENTS.get(question['number'], 'main'), phase='main',
+            total_questions=30, current_question=7
+        ))
+        html = render_template(
+            'assessment.html', question=question,
+            question_card=QUESTION_FRAGMENTS.get(question['number'], 'main'), phase='main',
+            total_questions=30, current_question=7
+        ).encode()
+        sizes['assessment_html_bytes'] = len(html)
+        sizes['assessment_html_gzip_bytes'] = len(gzip.compress(html, compresslevel=6))
+        results['render[question_card.html]'] = measure(
+            lambda: QUESTION_FRAGMENTS.render(question['number'], 'main'))
+        results['render[results.html]'] = measure(lambda: render_template(
+            'results.html',
+            riasec_code=scoring.resolve_riasec_code(riasec),
+            top_riasec=sorted(riasec.items(), key=lambda x: x[1], reverse=True)[:3],
+            top_aptitudes=sorted(aptitudes.items(), key=lambda x: x[1], reverse=True)[:3],
+            all_riasec_scores=riasec,
+            all_aptitude_scores=aptitudes,
+            max_riasec_score=max(riasec.values()) or 1,
+            max_aptitude_score=max(aptitudes.values()) or 1,
+        ))
+
+def bench_end_to_end(results, sizes, rnd):
+    from app import app
+
+    def one_session():
+        sizes['e2e_questions_asked'] = simulate_session(app.test_client(), rnd)
+
+    results['e2e_session'] = measure(one_session)
+
+# -----------------------------
+# Property Checks
+# -----------------------------
+def reference_tie_pairs(scores, delta, depth):
+    """
+    Straightforward restatement of the tie-breaker rule to check against.
+    """
+    ranked = sorted(scores, key=lambda c: (-scores[c], RIASEC_ORDER.index(c)))[:depth]
+    pairs = set()
+    for i in range(len(ranked) - 1):
+        a, b = ranked[i], ranked[i + 1]
+        if abs(scores[a] - scores[b]) < delta:
+            a, b = sorted((a, b), key=RIASEC_ORDER.index)
+            pairs.add(f"{a}-{b}")
+    return pairs
+
+def check_tie_breakers(rnd, cases=20000):
+    table_pairs = {q['pair'] for q in TIE_BREAKER_QUESTIONS}
+    for _ in range(cases):
+        scores = {c: rnd.randint(0, 12) for c in RIASEC_ORDER}
+        delta = rnd.randint(1, 4)
+        depth = rnd.randint(2, 6)
+        pairs = scoring.identify_tie_pairs(scores, delta=delta, depth=depth)
+        assert pairs == reference_tie_pairs(scores, delta, depth), (scores, delta, depth)
+
+        # Every pair is canonical and has its own questions
+        assert pairs <= table_pairs, pairs
+        ordered = scoring.sort_pairs_resolver_style(pairs)
+        numbers = [q['number'] for q in scoring.get_questions_for_pairs(ordered, set())]
+        expected = [q['number'] for p in ordered
+                    for q in [t for t in TIE_BREAKER_QUESTIONS if t['pair'] == p][:scoring.MAX_TIE_BREAKER_QS]]
+        assert numbers == expected, (ordered, numbers)
+
+        # Shuffling the score dict does not change the outcome
+        items = list(scores.items())
+        rnd.shuffle(items)
+        assert scoring.identify_tie_pairs(dict(items), delta=delta, depth=depth) == pairs
+
+    # Pairs stored by older sessions in alphabetical order still match
+    for pair in table_pairs:
+        a, b = pair.split('-')
+        assert scoring.get_questions_for_pairs([f"{b}-{a}"], set()) == \
+            scoring.get_questions_for_pairs([pair], set())
+        assert scoring.get_questions_for_pairs([pair], {f"{b}-{a}"}) == []
+    return cases
+
+def check_adaptive_tie_breakers(rnd, cases=3000):
+    from benchmarks.simulate import SimulatedRespondent, main_phase_scores, run_tie_breakers
+
+    for _ in range(cases):
+        respondent = SimulatedRespondent(rnd, rnd.choice([0.3, 1.0, 10.0]), rnd.random() * 0.5)
+        scores = main_phase_scores(respondent)
+        delta, depth = rnd.randint(1, 3), rnd.randint(2, 4)
+        static_n, static_code = run_tie_breakers(respondent, scores, False, delta, depth)
+        adaptive_n, adaptive_code = run_tie_breakers(respondent, scores, True, delta, depth)
+        # Adaptive asks a subset of the same questions and lands on the same code
+        assert adaptive_code == static_code, (scores, delta, depth)
+        assert adaptive_n <= static_n
+    return cases
+
+def check_adaptive_main_phase(rnd, cases=1500):
+    import itertools
+    from benchmarks.simulate import simulate
+
+    main_numbers = [q['number'] for q in QUESTIONS]
+    for _ in range(cases):
+        remaining = rnd.sample(main_numbers, rnd.randint(1, 6))
+        answered = [n for n in main_numbers if n not in remaining]
+        scores = scoring.score_answers({str(n): rnd.choice('AB') for n in answered})[0]
+        delta, depth = rnd.randint(1, 3), rnd.randint(2, 3)
+
+        outcomes = set()
+        for letters in itertools.product('AB', repeat=len(remaining)):
+            final = dict(scores)
+            for qnum, letter in zip(remaining, letters):
+                option = scoring.QUESTION_BANK[qnum][letter]
+                if option.riasec:
+                    final[option.riasec] += option.riasec_delta
+            outcomes.add((scoring.resolve_riasec_code(final),
+                          frozenset(scoring.identify_tie_pairs(final, delta, depth))))
+        # Locked exactly when every completion gives one code and no tie pair
+        expected = len(outcomes) == 1 and not next(iter(outcomes))[1]
+        assert scoring.code_locked(scores, remaining, delta=delta, depth=depth) == expected, \
+            (scores, remaining, delta, depth)
+
+    # simulate() asserts the whole adaptive flow ends on the full flow's code
+    simulate(respondents=300, seed=rnd.randrange(10 ** 6))
+    return cases
+
+CHECKS = {
+    'tie_breakers': check_tie_breakers,
+    'adaptive_tie_breakers': check_adaptive_tie_breakers,
+    'adaptive_main_phase': check_adaptive_main_phase,
+}
+
+BENCHMARKS = {
+    'scoring': bench_scoring,
+    'enrichment': bench_enrichment,
+    'tie_breakers': bench_tie_breakers,
+    'batch': bench_batch,
+    'session': bench_session,
+    'render': bench_render,
+    'e2e': bench_end_to_end,
+}
+
+# -----------------------------
+# Main
+# -----------------------------
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def compare(current, baseline, threshold):
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            continue
+        ratio = result['median_us'] / before['median_us'] if before['median_us'] else float('inf')
+        flag = '  SLOWER' if ratio > threshold else ''
+        print(f"{name:45s} {before['median_us']:>12.2f} -> {result['median_us']:>12.2f} us  x{ratio:.2f}{flag}",
+              file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the assessment hot paths.")
+    parser.add_argument('-o', '--output', help="write JSON results here instead of stdout")
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--compare', help="earlier JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio that counts as a regression")
+    parser.add_argument('--check', action='store_true',
+                        help="run the property checks first and stop if any fails")
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    results, sizes = {}, {}
+    started = time.perf_counter()
+    checks = {}
+    if args.check:
+        for name, check in CHECKS.items():
+            checks[name] = check(random.Random(args.seed))
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](results, sizes, rnd)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'duration_s': round(time.perf_counter() - started, 2),
+        },
+        'results': results,
+        'sizes': sizes,
+    }
+    if checks:
+        report['checks'] = checks
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Population simulation of the assessment flow, without HTTP.
+
+    python -m benchmarks.simulate --respondents 5000 --spread 1.0
+
+Respondents answer by the same Dirichlet preference model as the load
+generator (benchmarks.loadgen), answering any given question the same in
+every run. Each one goes through:
+
+- the main phase in full and with MAIN_PHASE_ADAPTIVE, which stops once
+  neither the code nor the tie-breakers can change (questions saved, and a
+  check that the code after the main phase is the same);
+- tie-breakers after the full main phase, up-front (every question of every
+  tied pair) and with TIE_BREAKER_ADAPTIVE;
+- the whole flow with both adaptive modes, against the whole flow with
+  neither. simulate() asserts that both always end with the same code.
+
+Prints a JSON report of questions asked per mode and how often the modes
+end with the same code.
+"""
+import argparse
+import json
+import random
+import sys
+
+from questions.bank import MAIN_TOTAL, QUESTIONS_BY_NUMBER
+from benchmarks.loadgen import respondent_preferences, choose_answer
+import scoring
+
+
+class SimulatedRespondent:
+    def __init__(self, rnd, spread, noise):
+        self.preferences = respondent_preferences(rnd, spread)
+        # One draw per question so every mode sees the same answers
+        self.choices = {
+            qnum: choose_answer(rnd, qnum, self.preferences, noise) for qnum in QUESTIONS_BY_NUMBER
+        }
+
+    def answer(self, qnum):
+        return self.choices[qnum]
+
+
+def main_phase_scores(respondent):
+    answers = {str(n): respondent.answer(n) for n in range(1, MAIN_TOTAL + 1)}
+    return scoring.score_answers(answers)[0]
+
+def run_adaptive_main(respondent, rnd, delta=scoring.DEFAULT_TIE_BREAKER_DELTA,
+                      depth=scoring.DEFAULT_TIE_BREAKER_DEPTH):
+    """
+    Mirrors settle_main_phase over a shuffled question order.
+    Returns (main questions asked, RIASEC scores at the end of the phase).
+    """
+    order = rnd.sample(range(1, MAIN_TOTAL + 1), MAIN_TOTAL)
+    scores = {code: 0 for code in scoring.RIASEC_ORDER}
+    vector = [0] * len(scoring.NEW_APTITUDES)
+    for asked, qnum in enumerate(order, 1):
+        scoring.apply_answer(scores, vector, qnum, None, respondent.answer(qnum))
+        if asked < MAIN_TOTAL and scoring.code_locked(scores, order[asked:], delta=delta, depth=depth):
+            return asked, scores
+    return MAIN_TOTAL, scores
+
+def run_tie_breakers(respondent, riasec_scores, adaptive=False,
+                     delta=scoring.DEFAULT_TIE_BREAKER_DELTA, depth=scoring.DEFAULT_TIE_BREAKER_DEPTH):
+    """
+    Mirrors begin_tie_breakers / extend_tie_breakers.
+    Returns (tie-breaker questions asked, final code).
+    """
+    scores = dict(riasec_scores)
+    pairs = scoring.sort_pairs_resolver_style(scoring.identify_tie_pairs(scores, delta, depth))
+
+    def apply(qnum):
+        option = scoring.QUESTION_BANK[qnum][respondent.answer(qnum)]
+        if option.riasec:
+            scores[option.riasec] += option.riasec_delta
+
+    asked = []
+    if not adaptive:
+        for q in scoring.get_questions_for_pairs(pairs, set()):
+            asked.append(q['number'])
+            apply(q['number'])
+    else:
+        qnum, pending = scoring.next_tie_breaker(scores, pairs, asked)
+        while qnum is not None:
+            asked.append(qnum)
+            apply(qnum)
+            qnum, pending = scoring.next_tie_breaker(scores, pending, asked)
+
+    return len(asked), scoring.resolve_riasec_code(scores)
+
+def summarize(counts):
+    n = len(counts) or 1
+    return {
+        'mean_questions': round(sum(counts) / n, 4),
+        'max_questions': max(counts) if counts else 0,
+        'respondents_asked': sum(1 for c in counts if c),
+    }
+
+def simulate(respondents=2000, spread=1.0, noise=0.1, seed=1234,
+             delta=scoring.DEFAULT_TIE_BREAKER_DELTA, depth=scoring.DEFAULT_TIE_BREAKER_DEPTH):
+    rnd = random.Random(seed)
+    main_counts, static_counts, adaptive_counts = [], [], []
+    full_flow, adaptive_flow = [], []
+    main_same = tie_same = flow_same = 0
+    for _ in range(respondents):
+        respondent = SimulatedRespondent(rnd, spread, noise)
+        scores = main_phase_scores(respondent)
+
+        main_n, main_scores = run_adaptive_main(respondent, rnd, delta, depth)
+        main_counts.append(main_n)
+        main_same += scoring.resolve_riasec_code(main_scores) == scoring.resolve_riasec_code(scores)
+
+        static_n, static_code = run_tie_breakers(respondent, scores, False, delta, depth)
+        adaptive_n, adaptive_code = run_tie_breakers(respondent, scores, True, delta, depth)
+        static_counts.append(static_n)
+        adaptive_counts.append(adaptive_n)
+        tie_same += static_code == adaptive_code
+
+        both_n, both_code = run_tie_breakers(respondent, main_scores, True, delta, depth)
+        full_flow.append(MAIN_TOTAL + static_n)
+        adaptive_flow.append(main_n + both_n)
+        flow_same += both_code == static_code
+
+    # A shortened main phase must never change anyone's final code
+    assert flow_same == respondents, f"adaptive flow changed {respondents - flow_same} codes"
+
+    n = max(1, respondents)
+    return {
+        'meta': {'respondents': respondents, 'spread': spread, 'noise': noise, 'seed': seed,
+                 'delta': delta, 'depth': depth},
+        'main_phase': {
+            'full': MAIN_TOTAL,
+            'adaptive': summarize(main_counts),
+            'mean_questions_saved': round(MAIN_TOTAL - sum(main_counts) / n, 4),
+            'stopped_early_rate': round(sum(1 for c in main_counts if c < MAIN_TOTAL) / n, 4),
+            'same_code_rate': round(main_same / n, 4),
+        },
+        'tie_breakers': {
+            'static': summarize(static_counts),
+            'adaptive': summarize(adaptive_counts),
+            'same_code_rate': round(tie_same / n, 4),
+        },
+        'whole_flow': {
+            'static': summarize(full_flow),
+            'adaptive': summarize(adaptive_flow),
+            'same_code_rate': round(flow_same / n, 4),
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate respondents through the assessment flow.")
+    parser.add_argument('-n', '--respondents', type=int, default=2000)
+    parser.add_argument('--spread', type=float, default=1.0)
+    parser.add_argument('--noise', type=float, default=0.1)
+    parser.add_argument('--delta', type=int, default=scoring.DEFAULT_TIE_BREAKER_DELTA)
+    parser.add_argument('--depth', type=int, default=scoring.DEFAULT_TIE_BREAKER_DEPTH)
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    report = simulate(args.respondents, args.spread, args.noise, args.seed, args.delta, args.depth)
+    json.dump(report, sys.stdout, indent=2, sort_keys=True)
+    print()
+
+if __name__ == '__main__':
+    main()
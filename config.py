@@ -8,12 +8,93 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev_secret_key_change_in_production')
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     
-    # Tie-breaker configuration
+    # Stop the main phase as soon as the remaining questions can no longer
+    # change the three-letter code or lead to tie-breakers (aptitude totals
+    # then cover fewer answers)
+    MAIN_PHASE_ADAPTIVE = os.environ.get('MAIN_PHASE_ADAPTIVE', 'False').lower() == 'true'
+
+    # Tie-breaker configuration: adjacent dimensions among the top
+    # TIE_BREAKER_DEPTH whose scores differ by less than TIE_BREAKER_DELTA
     TIE_BREAKER_DELTA = int(os.environ.get('TIE_BREAKER_DELTA', 2))
+    TIE_BREAKER_DEPTH = int(os.environ.get('TIE_BREAKER_DEPTH', 3))
+    # Ask tie-breakers one at a time and stop as soon as the code is settled
+    TIE_BREAKER_ADAPTIVE = os.environ.get('TIE_BREAKER_ADAPTIVE', 'False').lower() == 'true'
     
     # Session configuration
     SESSION_PERMANENT = False
-    SESSION_TYPE = 'filesystem'
+    # Signed-cookie sessions work on every instance without shared state;
+    # 'sqlite' ('filesystem'), 'memory' and 'redis' are opt-in (session_store.py)
+    SESSION_TYPE = os.environ.get('SESSION_TYPE', 'cookie')
+    SESSION_SQLITE_PATH = os.environ.get('SESSION_SQLITE_PATH')
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL')
+    SESSION_KEY_PREFIX = 'session:'
+    SESSION_MEMORY_MAX_ENTRIES = int(os.environ.get('SESSION_MEMORY_MAX_ENTRIES', 10000))
+
+    # Result persistence: rows are queued and appended to the sheet in batches
+    SHEETS_WRITE_BEHIND = os.environ.get('SHEETS_WRITE_BEHIND', 'True').lower() == 'true'
+    SHEETS_BATCH_SIZE = int(os.environ.get('SHEETS_BATCH_SIZE', 50))
+    SHEETS_FLUSH_INTERVAL = float(os.environ.get('SHEETS_FLUSH_INTERVAL', 2.0))
+    # Rows are written to a local SQLite outbox first; set SHEETS_OUTBOX=false
+    # to fall back to the in-memory queue
+    SHEETS_OUTBOX = os.environ.get('SHEETS_OUTBOX', 'True').lower() == 'true'
+    SHEETS_OUTBOX_PATH = os.environ.get('SHEETS_OUTBOX_PATH')
+    SHEETS_OUTBOX_SYNC = os.environ.get('SHEETS_OUTBOX_SYNC', 'NORMAL')
+    # 'google' (default) or 'fake' for the local stand-in in fake_sheets.py;
+    # with SHEETS_FAKE_URL set the fake client talks to a fake_sheets server
+    SHEETS_BACKEND = os.environ.get('SHEETS_BACKEND', 'google')
+    SHEETS_FAKE_URL = os.environ.get('SHEETS_FAKE_URL')
+    SHEETS_FAKE_LATENCY = float(os.environ.get('SHEETS_FAKE_LATENCY', 0.0))
+    SHEETS_FAKE_JITTER = float(os.environ.get('SHEETS_FAKE_JITTER', 0.0))
+    SHEETS_FAKE_QUOTA_RATE = float(os.environ.get('SHEETS_FAKE_QUOTA_RATE', 0.0))
+    SHEETS_FAKE_FAILURE_RATE = float(os.environ.get('SHEETS_FAKE_FAILURE_RATE', 0.0))
+
+    # Live score push (Server-Sent Events)
+    LIVE_SCORES_STREAM_SECONDS = int(os.environ.get('LIVE_SCORES_STREAM_SECONDS', 55))
+    LIVE_SCORES_POLL_INTERVAL = float(os.environ.get('LIVE_SCORES_POLL_INTERVAL', 1.0))
+    LIVE_SCORES_MAX_POLL_INTERVAL = float(os.environ.get('LIVE_SCORES_MAX_POLL_INTERVAL', 10.0))
+
+    # Add keyword boosts from the respondent's free-text occupation and
+    # education to their aptitude scores; lookups are memoized per process
+    PROFILE_ENRICHMENT = os.environ.get('PROFILE_ENRICHMENT', 'False').lower() == 'true'
+    PROFILE_ENRICHMENT_CACHE_SIZE = int(os.environ.get('PROFILE_ENRICHMENT_CACHE_SIZE', 4096))
+
+    # Metrics: /metrics in Prometheus text format, optional JSON timing logs
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    METRICS_LOG_REQUESTS = os.environ.get('METRICS_LOG_REQUESTS', 'False').lower() == 'true'
+
+    # Sampling profiler: cProfile a share of requests, or those sending
+    # PROFILING_HEADER set to PROFILING_TOKEN; see profiling.py. Has no effect
+    # under gevent workers (cProfile would mix in other greenlets' work)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILING_SAMPLE_PERCENT = float(os.environ.get('PROFILING_SAMPLE_PERCENT', 0.0))
+    PROFILING_HEADER = os.environ.get('PROFILING_HEADER', 'X-Profile')
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')
+    PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', 200))
+
+    # Compiled templates are cached on disk for fast cold starts (set to an
+    # empty string to disable); all templates and question cards are
+    # rendered once at startup
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    TEMPLATE_PREWARM = os.environ.get('TEMPLATE_PREWARM', 'True').lower() == 'true'
+    # Re-check templates and re-render question cards on every request while
+    # editing them; set explicitly, as DEBUG is on in the deployed config
+    TEMPLATES_AUTO_RELOAD = os.environ.get('TEMPLATES_AUTO_RELOAD', 'False').lower() == 'true'
+
+    # Static assets are served fingerprinted from /assets with this max-age;
+    # gzip HTML/JSON responses when COMPRESS_RESPONSES is on (off by default
+    # for deployments whose proxy already compresses)
+    ASSETS_MAX_AGE = int(os.environ.get('ASSETS_MAX_AGE', 365 * 24 * 3600))
+    # Re-hash static files on each page render while editing them
+    ASSETS_WATCH = os.environ.get('ASSETS_WATCH', 'False').lower() == 'true'
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'False').lower() == 'true'
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+
+    # Single-page assessment: question bank shipped once, answers sent in batches
+    SINGLE_PAGE_ASSESSMENT = os.environ.get('SINGLE_PAGE_ASSESSMENT', 'False').lower() == 'true'
+    SINGLE_PAGE_BATCH_SIZE = int(os.environ.get('SINGLE_PAGE_BATCH_SIZE', 5))
+    SINGLE_PAGE_FLUSH_SECONDS = int(os.environ.get('SINGLE_PAGE_FLUSH_SECONDS', 10))
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -22,6 +103,11 @@ class ProductionConfig(Config):
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = 1800
+    # Instances do not share local disk: keep state in the cookie unless
+    # a Redis-protocol server is configured for sessions.
+    SESSION_TYPE = os.environ.get(
+        'SESSION_TYPE', 'redis' if os.environ.get('SESSION_REDIS_URL') else 'cookie'
+    )
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -0,0 +1,184 @@
+from collections import Counter, OrderedDict
+import re
+import threading
+
+from questions.bank import NEW_APTITUDES, APTITUDE_INDEX, QUESTIONS_BY_NUMBER
+
+# -----------------------------
+# Text Enrichment Keywords
+# -----------------------------
+KEYWORD_TO_APTS = {
+    r"mechanic|machin|tool|repair|operate|equipment|assembly": ["Mechanical", "Spatial/Design"],
+    r"design|creative|art|visual|graphic|illustrat|style|compose": ["Creative", "Writing/Expression", "Spatial/Design"],
+    r"analy|research|study|evaluate|experiment|data|statistic": ["Logical Reasoning", "Scientific", "Numerical"],
+    r"teach|help|support|counsel|mentor|coach": ["Social/Helping", "Verbal Communication"],
+    r"lead|manage|supervis|coordinate|direct|influence|persuad": ["Leadership/Persuasion", "Organizing/Structuring"],
+    r"software|digital|computer|it|program|code|data entry|excel": ["Digital/Computer", "Organizing/Structuring"],
+    r"write|document|report|communicat|present": ["Writing/Expression", "Verbal Communication"],
+    r"budget|finance|cost|account|number|math|calculate": ["Numerical"],
+}
+
+QUESTION_TEXT_FIELDS = ('explain','hint','job_text')
+
+# -----------------------------
+# Compiled Matcher
+# -----------------------------
+# All keywords are plain literals, so the table compiles into one scan: a
+# zero-width lookahead over a prefix trie of every keyword finds the longest
+# keyword starting at each position. Every other keyword matching there is a
+# prefix of it, so each keyword carries the pattern indexes of its prefixes
+# too. That reproduces one re.search per pattern, overlaps included
+# ("data entry" also counts as "data").
+def trie_pattern(literals):
+    trie = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def walk(node):
+        terminal = '' in node
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: longer keywords are tried before the shorter one
+        return ('(?:' + body + ')?') if terminal else body
+
+    return walk(trie)
+
+def compile_keywords(table):
+    patterns = list(table)
+    groups = {}
+    for index, patt in enumerate(patterns):
+        for literal in patt.split('|'):
+            groups.setdefault(literal, set()).add(index)
+
+    prefix_groups = {
+        literal: frozenset().union(*(groups[p] for p in groups if literal.startswith(p)))
+        for literal in groups
+    }
+    matcher = re.compile('(?=(' + trie_pattern(groups) + '))')
+    return matcher, prefix_groups, [table[p] for p in patterns]
+
+KEYWORD_MATCHER, KEYWORD_GROUPS, PATTERN_APTITUDES = compile_keywords(KEYWORD_TO_APTS)
+
+# -----------------------------
+# Enrichment
+# -----------------------------
+def matched_patterns(text):
+    """
+    Indexes (into KEYWORD_TO_APTS order) of the patterns found in `text`.
+    """
+    found = set()
+    for m in KEYWORD_MATCHER.finditer(text.lower()):
+        found |= KEYWORD_GROUPS[m.group(1)]
+        if len(found) == len(PATTERN_APTITUDES):
+            break
+    return found
+
+def enrich_from_text(text):
+    boosts = Counter()
+    if not text or not isinstance(text, str):
+        return boosts
+    for index in matched_patterns(text):
+        for a in PATTERN_APTITUDES[index]:
+            boosts[a] += 1
+    return boosts
+
+def question_enrichment(question):
+    """
+    Sums the keyword boosts of a question's free-text fields into a vector
+    aligned with NEW_APTITUDES.
+    """
+    vector = [0] * len(NEW_APTITUDES)
+    for field in QUESTION_TEXT_FIELDS:
+        if field in question:
+            for k,v in enrich_from_text(question[field]).items():
+                vector[APTITUDE_INDEX[k]] += v
+    return tuple(vector)
+
+# Question texts are static: boosts are computed once at import. Only
+# questions with a non-zero boost are listed.
+QUESTION_ENRICHMENT = {
+    qnum: vector for qnum, vector in (
+        (qnum, question_enrichment(q)) for qnum, q in QUESTIONS_BY_NUMBER.items()
+    ) if any(vector)
+}
+
+# -----------------------------
+# Respondent Profile Enrichment
+# -----------------------------
+PROFILE_TEXT_FIELDS = ('occupation', 'education')
+
+def normalize_text(text):
+    return ' '.join(text.lower().split()) if isinstance(text, str) else ''
+
+def text_vector(text):
+    vector = [0] * len(NEW_APTITUDES)
+    for k, v in enrich_from_text(text).items():
+        vector[APTITUDE_INDEX[k]] += v
+    return tuple(vector)
+
+
+class TextEnrichmentCache:
+    """
+    LRU memo of text -> boost vector, keyed on normalized text.
+    Occupations and degrees repeat heavily, so most lookups are hits.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def vector(self, text):
+        key = normalize_text(text)
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+        vector = text_vector(key)
+        with self._lock:
+            self._data[key] = vector
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return vector
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+PROFILE_CACHE = TextEnrichmentCache()
+
+def profile_enrichment(user_info, cache=PROFILE_CACHE):
+    """
+    Boost vector (aligned with NEW_APTITUDES) for a respondent's free-text
+    occupation and education.
+    """
+    vector = [0] * len(NEW_APTITUDES)
+    for field in PROFILE_TEXT_FIELDS:
+        text = (user_info or {}).get(field)
+        if text:
+            for i, boost in enumerate(cache.vector(text)):
+                vector[i] += boost
+    return tuple(vector)
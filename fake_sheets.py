@@ -0,0 +1,256 @@
+"""
+Local stand-in for Google Sheets, for tests and capacity runs.
+
+FakeSheetsClient mimics the parts of gspread the app uses (open(...).sheet1,
+append_row, append_rows) with injectable latency, 429 quota errors and
+hard failures, and keeps the appended rows in memory.
+
+To share one fake sheet between several workers or instances, run it as a
+server and point the app at it:
+
+    python fake_sheets.py --port 8765 --latency 0.3 --quota-rate 0.05
+    SHEETS_BACKEND=fake SHEETS_FAKE_URL=http://localhost:8765 gunicorn app:app
+
+Errors cross the wire as the same JSON bodies and status codes Google
+returns, so the app sees the same gspread exceptions either way.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+import requests
+from gspread.exceptions import APIError, SpreadsheetNotFound
+
+
+def error_body(code, message):
+    return json.dumps({'error': {'code': code, 'message': message}}).encode()
+
+def api_error(code, message):
+    response = requests.models.Response()
+    response.status_code = code
+    response._content = error_body(code, message)
+    return APIError(response)
+
+# -----------------------------
+# In-process Fake
+# -----------------------------
+class FakeWorksheet:
+    def __init__(self, client):
+        self.client = client
+        self.rows = []
+
+    def append_row(self, row):
+        return self.append_rows([row])
+
+    def append_rows(self, rows):
+        self.client.simulate('append')
+        with self.client.lock:
+            self.rows.extend(list(r) for r in rows)
+            self.client.appended_rows += len(rows)
+        return {'updates': {'updatedRows': len(rows)}}
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheet1):
+        self.sheet1 = sheet1
+
+
+class FakeSheetsClient:
+    def __init__(self, latency=0.0, jitter=0.0, quota_error_rate=0.0, failure_rate=0.0,
+                 sheet_names=('R1',), seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_error_rate = quota_error_rate
+        self.failure_rate = failure_rate
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.worksheets = {name: FakeWorksheet(self) for name in sheet_names}
+        self.calls = {'open': 0, 'append': 0}
+        self.quota_errors = 0
+        self.failures = 0
+        self.appended_rows = 0
+
+    def simulate(self, call):
+        with self.lock:
+            self.calls[call] += 1
+            roll = self.random.random()
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if roll < self.quota_error_rate:
+            with self.lock:
+                self.quota_errors += 1
+            raise api_error(429, "Quota exceeded for quota metric 'Write requests'")
+        if roll < self.quota_error_rate + self.failure_rate:
+            with self.lock:
+                self.failures += 1
+            raise api_error(500, "Internal error encountered.")
+
+    def open(self, name):
+        self.simulate('open')
+        if name not in self.worksheets:
+            raise SpreadsheetNotFound(name)
+        return FakeSpreadsheet(self.worksheets[name])
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'appended_rows': self.appended_rows,
+                'quota_errors': self.quota_errors,
+                'failures': self.failures,
+            }
+
+# -----------------------------
+# HTTP Server & Client
+# -----------------------------
+class FakeSheetsHandler(BaseHTTPRequestHandler):
+    """
+    GET  /spreadsheets/<name>          open (404 if unknown)
+    POST /spreadsheets/<name>/append   body {"rows": [...]}
+    GET  /spreadsheets/<name>/rows     rows appended so far
+    GET  /stats                        FakeSheetsClient.stats()
+    """
+    def send_json(self, status, body):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def dispatch(self, action):
+        fake = self.server.fake
+        parts = [unquote(p) for p in self.path.strip('/').split('/')]
+        try:
+            if parts == ['stats']:
+                return self.send_json(200, fake.stats())
+            if len(parts) < 2 or parts[0] != 'spreadsheets':
+                return self.send_json(404, error_body(404, 'Not found'))
+            name, rest = parts[1], parts[2:]
+            if rest == ['rows'] and action == 'GET':
+                if name not in fake.worksheets:
+                    raise SpreadsheetNotFound(name)
+                with fake.lock:
+                    return self.send_json(200, {'rows': list(fake.worksheets[name].rows)})
+            sheet = fake.open(name).sheet1
+            if not rest and action == 'GET':
+                return self.send_json(200, {'name': name})
+            if rest == ['append'] and action == 'POST':
+                length = int(self.headers.get('Content-Length') or 0)
+                rows = json.loads(self.rfile.read(length) or b'{}').get('rows', [])
+                return self.send_json(200, sheet.append_rows(rows))
+            return self.send_json(404, error_body(404, 'Not found'))
+        except SpreadsheetNotFound as e:
+            return self.send_json(404, error_body(404, f'Spreadsheet not found: {e}'))
+        except APIError as e:
+            return self.send_json(e.code, e.response.content)
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(fake, host='127.0.0.1', port=8765):
+    server = ThreadingHTTPServer((host, port), FakeSheetsHandler)
+    server.daemon_threads = True
+    server.fake = fake
+    return server
+
+
+class HttpWorksheet:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def append_row(self, row):
+        return self.append_rows([row])
+
+    def append_rows(self, rows):
+        return self.client.request('POST', f'/spreadsheets/{quote(self.name, safe="")}/append',
+                                   json={'rows': rows})
+
+
+class HttpSheetsClient:
+    """
+    gspread-shaped client for a fake_sheets server.
+    """
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def request(self, method, path, **kwargs):
+        response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        if response.status_code >= 400:
+            raise APIError(response)
+        return response.json()
+
+    def open(self, name):
+        try:
+            self.request('GET', f'/spreadsheets/{quote(name, safe="")}')
+        except APIError as e:
+            if e.code == 404:
+                raise SpreadsheetNotFound(name)
+            raise
+        return FakeSpreadsheet(HttpWorksheet(self, name))
+
+    def stats(self):
+        return self.request('GET', '/stats')
+
+
+def create_fake_client(config):
+    """
+    Builds the fake client from SHEETS_FAKE_* settings.
+    """
+    if config.get('SHEETS_FAKE_URL'):
+        return HttpSheetsClient(config['SHEETS_FAKE_URL'])
+    return FakeSheetsClient(
+        latency=config.get('SHEETS_FAKE_LATENCY', 0.0),
+        jitter=config.get('SHEETS_FAKE_JITTER', 0.0),
+        quota_error_rate=config.get('SHEETS_FAKE_QUOTA_RATE', 0.0),
+        failure_rate=config.get('SHEETS_FAKE_FAILURE_RATE', 0.0),
+    )
+
+# -----------------------------
+# Main
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local fake Google Sheets server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--sheet', action='append', dest='sheets',
+                        help="spreadsheet name to serve (repeatable, default R1)")
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--quota-rate', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    fake = FakeSheetsClient(
+        latency=args.latency,
+        jitter=args.jitter,
+        quota_error_rate=args.quota_rate,
+        failure_rate=args.failure_rate,
+        sheet_names=tuple(args.sheets or ['R1']),
+        seed=args.seed,
+    )
+    server = make_server(fake, args.host, args.port)
+    print(f"Fake Sheets listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
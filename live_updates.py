@@ -0,0 +1,117 @@
+"""
+Server-Sent Events channel for live score updates.
+
+/save_answer publishes the new top-3 totals for the respondent's channel and
+open /live_scores/stream connections wake up and push them; nothing is sent
+while the respondent is idle. Within a process, waiting streams are woken
+through a Condition. When sessions live in a shared store (SQLite on one
+node, or Redis), updates are also written there so a stream held by another
+worker or instance picks them up on its next store check. Those checks back
+off while the respondent is idle: the interval grows with the time since
+the last update, from poll_interval up to max_poll_interval. The in-process
+memory store is never used, so channels do not take session LRU slots.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+CHANNEL_KEY_PREFIX = 'live:'
+
+
+class ScoreBroker:
+    def __init__(self, store=None, ttl=1800, poll_interval=1.0, max_poll_interval=10.0):
+        # A per-process store gains nothing over the in-memory channels
+        self.store = store if store is not None and store.shared else None
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(poll_interval, max_poll_interval)
+        self._latest = OrderedDict()
+        self._published = {}
+        self._cond = threading.Condition()
+
+    def publish(self, channel, version, payload):
+        now = time.monotonic()
+        with self._cond:
+            self._latest[channel] = (version, payload)
+            self._latest.move_to_end(channel)
+            self._published[channel] = now
+            # Channels are ordered by last publish; drop the ones past their TTL
+            while self._latest:
+                oldest = next(iter(self._latest))
+                if now - self._published[oldest] < self.ttl:
+                    break
+                self._latest.popitem(last=False)
+                del self._published[oldest]
+            self._cond.notify_all()
+        if self.store is not None:
+            message = json.dumps({'version': version, 'payload': payload}).encode()
+            self.store.set(CHANNEL_KEY_PREFIX + channel, message, self.ttl)
+
+    def latest(self, channel, after_version=None):
+        current = self._latest.get(channel)
+        if current is not None and after_version is not None and current[0] > after_version:
+            # Already newer locally; skip the store round trip
+            return current
+        if self.store is not None:
+            raw = self.store.get(CHANNEL_KEY_PREFIX + channel)
+            if raw is not None:
+                message = json.loads(raw)
+                if current is None or message['version'] > current[0]:
+                    current = (message['version'], message['payload'])
+        return current
+
+    def poll_delay(self, idle_seconds):
+        return min(self.max_poll_interval, max(self.poll_interval, idle_seconds / 4))
+
+    def wait(self, channel, after_version, timeout, idle_since=None):
+        """
+        Blocks until the channel has a version newer than `after_version`.
+        `idle_since` (monotonic time of the last update seen) stretches the
+        store polling interval. Returns (version, payload), or None on timeout.
+        """
+        now = time.monotonic()
+        deadline = now + timeout
+        idle_since = now if idle_since is None else idle_since
+        while True:
+            current = self.latest(channel, after_version)
+            if current is not None and current[0] > after_version:
+                return current
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                return None
+            with self._cond:
+                local = self._latest.get(channel)
+                if local is None or local[0] <= after_version:
+                    self._cond.wait(min(remaining, self.poll_delay(now - idle_since))
+                                    if self.store is not None else remaining)
+
+
+def format_event(version, payload):
+    return f"id: {version}\ndata: {json.dumps(payload)}\n\n"
+
+
+def event_stream(broker, channel, version, payload, max_seconds=55, heartbeat=15):
+    """
+    Yields the current totals (unless the client already has them), then
+    each newer version until max_seconds. EventSource reconnects on its own
+    and resumes from the last event id.
+    """
+    yield "retry: 3000\n"
+    if payload is not None:
+        yield format_event(version, payload)
+
+    deadline = time.monotonic() + max_seconds
+    idle_since = time.monotonic()
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        update = broker.wait(channel, version, min(heartbeat, remaining), idle_since)
+        if update is None:
+            yield ": keep-alive\n\n"
+            continue
+        version, payload = update
+        idle_since = time.monotonic()
+        yield format_event(version, payload)
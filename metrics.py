@@ -0,0 +1,274 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+init_metrics(app) times every request into a per-endpoint histogram, times
+template rendering, records the size of the session written back to the
+client or store, and adds /metrics. Hot paths elsewhere use the module-level
+histograms directly:
+
+    with SHEETS_CALL_SECONDS.time(operation='open'):
+        ...
+
+Each gunicorn worker keeps its own registry, so a scrape sees the worker
+that served it; totals are summed across workers by the Prometheus query.
+
+With METRICS_LOG_REQUESTS on, every request also logs one JSON line with
+its duration and the timers that ran inside it.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import ContextDecorator
+
+from flask import Response, g, has_request_context, request, before_render_template, template_rendered
+from flask.sessions import SecureCookieSessionInterface
+
+logger = logging.getLogger('riasec.timing')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 512, 1024, 2048, 3072, 4096, 8192, 16384, 65536)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+# -----------------------------
+# Metric Types
+# -----------------------------
+class Timer(ContextDecorator):
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labels = self.labels
+        if 'outcome' in self.histogram.labelnames and 'outcome' not in labels:
+            labels = dict(labels, outcome='ok' if exc_type is None else 'error')
+        self.histogram.observe(time.perf_counter() - self.started, **labels)
+        return False
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+        if self.name.endswith('_seconds') and has_request_context() and 'timings' in g:
+            name = self.name + ('[' + ','.join(key) + ']' if key else '')
+            g.timings[name] = g.timings.get(name, 0) + value
+
+    def time(self, **labels):
+        """
+        Context manager / decorator observing the elapsed seconds.
+        """
+        return Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(key, list(s[0]), s[1], s[2]) for key, s in sorted(self._series.items())]
+        for key, counts, total, count in snapshot:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                yield self.name + '_bucket', dict(labels, le=format_value(float(bound))), cumulative
+            yield self.name + '_bucket', dict(labels, le='+Inf'), count
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, count
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for key, value in snapshot:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class GaugeCallback:
+    """
+    Gauge read from a callable at scrape time; returning None skips it.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return
+        if value is not None:
+            yield self.name, {}, value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, fn):
+        return self.register(GaugeCallback(name, help, fn))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+REQUEST_SECONDS = METRICS.histogram(
+    'riasec_request_duration_seconds', 'Request latency by endpoint.',
+    ('endpoint', 'method', 'status'))
+SCORING_SECONDS = METRICS.histogram(
+    'riasec_calculate_scores_seconds', 'Full rescoring of a session.', ('enrichment',))
+RENDER_SECONDS = METRICS.histogram(
+    'riasec_template_render_seconds', 'Jinja template rendering.', ('template',))
+SESSION_BYTES = METRICS.histogram(
+    'riasec_session_bytes', 'Serialized session size written per response.', ('store',),
+    buckets=SIZE_BUCKETS)
+SHEETS_CALL_SECONDS = METRICS.histogram(
+    'riasec_sheets_call_seconds', 'Google Sheets calls (auth, open, append).', ('operation', 'outcome'))
+
+# -----------------------------
+# Flask Integration
+# -----------------------------
+def _start_timer():
+    g.request_started = time.perf_counter()
+    g.timings = {}
+
+def _observe_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or '<unmatched>'
+    if g.get('log_timings'):
+        logger.info(json.dumps({
+            'endpoint': endpoint,
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 3),
+            'timings_ms': {k: round(v * 1000, 3) for k, v in g.get('timings', {}).items()},
+        }))
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method,
+                            status=response.status_code)
+    return response
+
+def _render_started(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault('render_started', []).append(time.perf_counter())
+
+def _render_finished(sender, template, context, **extra):
+    if has_request_context() and g.get('render_started'):
+        RENDER_SECONDS.observe(time.perf_counter() - g.render_started.pop(),
+                               template=template.name or '<string>')
+
+def _meter_cookie_sessions(app):
+    interface = app.session_interface
+    if not isinstance(interface, SecureCookieSessionInterface):
+        # Server-side stores record their payload size themselves
+        return
+    save_session = interface.save_session
+
+    def metered_save_session(app, session, response):
+        save_session(app, session, response)
+        prefix = app.config['SESSION_COOKIE_NAME'] + '='
+        for header in response.headers.getlist('Set-Cookie'):
+            if header.startswith(prefix):
+                SESSION_BYTES.observe(len(header.split(';', 1)[0]) - len(prefix), store='cookie')
+
+    interface.save_session = metered_save_session
+
+def init_metrics(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return None
+    log_requests = app.config.get('METRICS_LOG_REQUESTS', False)
+    if log_requests and not logger.handlers:
+        # Neither Flask nor gunicorn configures this logger; without a
+        # handler INFO records would fall through to the WARNING-level default
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def start_request_timer():
+        _start_timer()
+        g.log_timings = log_requests
+
+    app.after_request(_observe_request)
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
+    _meter_cookie_sessions(app)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+    app.extensions['metrics'] = METRICS
+    return METRICS
@@ -0,0 +1,315 @@
+"""
+Durable local outbox for result rows.
+
+save_to_google_sheet appends the row to a SQLite table before anything talks
+to Google. A drainer thread in each worker claims undelivered rows in batches,
+ships them with append_rows and marks them delivered, so rows survive Sheets
+outages and restarts: whatever is still undelivered when a process starts is
+replayed. Delivery is at-least-once.
+
+Rows whose batch is rejected with a non-retryable error max_attempts times
+are parked as dead letters (dead is set): they stay in the table but are no
+longer claimed, so one bad batch cannot hold back the rows behind it.
+Retryable errors (quota, outages) never park rows.
+
+The database runs in WAL mode with synchronous=NORMAL, so appends do not
+fsync individually; the WAL is synced in batches at checkpoints. Set
+SHEETS_OUTBOX_SYNC=FULL to fsync every append. On Cloud Run, point
+SHEETS_OUTBOX_PATH at a mounted volume for rows to outlive the instance.
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from write_behind import is_retryable, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    PURGE_EVERY = 1000
+
+    def __init__(self, path, synchronous='NORMAL', retention=7 * 24 * 3600):
+        self.path = path
+        self.synchronous = synchronous
+        self.retention = retention
+        # One connection per process behind a lock, as in SqliteStore: under
+        # gevent workers a threading.local would be per greenlet
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._appends = 0
+        with self._lock:
+            self._create()
+
+    def _create(self):
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, row TEXT NOT NULL, created REAL NOT NULL, "
+            "claimed_by TEXT, claimed_until REAL, delivered REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, dead REAL, last_error TEXT)"
+        )
+        self._migrate()
+        self._conn().execute(
+            "CREATE INDEX IF NOT EXISTS outbox_undelivered ON outbox (delivered, id)"
+        )
+
+    def _migrate(self):
+        # Outboxes created before dead-lettering lack the failure columns
+        columns = {r[1] for r in self._conn().execute("PRAGMA table_info(outbox)")}
+        for name, ddl in (('attempts', "INTEGER NOT NULL DEFAULT 0"),
+                          ('dead', "REAL"), ('last_error', "TEXT")):
+            if name not in columns:
+                self._conn().execute(f"ALTER TABLE outbox ADD COLUMN {name} {ddl}")
+
+    def _conn(self):
+        # Gunicorn forks workers; a connection must not cross the fork
+        if self._connection is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._connection = conn
+            self._pid = os.getpid()
+        return self._connection
+
+    def append(self, row):
+        with self._lock:
+            conn = self._conn()
+            cur = conn.execute(
+                "INSERT INTO outbox (row, created) VALUES (?, ?)", (json.dumps(row), time.time())
+            )
+            self._appends += 1
+            if self._appends % self.PURGE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM outbox WHERE delivered IS NOT NULL AND delivered < ?",
+                    (time.time() - self.retention,)
+                )
+            return cur.lastrowid
+
+    def claim(self, owner, limit, lease):
+        """
+        Leases up to `limit` undelivered rows to `owner`, oldest first.
+        Rows whose lease ran out (e.g. their worker died) can be claimed again.
+        A row that already failed is claimed on its own, so a rejected row
+        does not drag the rest of its batch towards the dead letters.
+        """
+        with self._lock:
+            conn = self._conn()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                candidates = conn.execute(
+                    "SELECT id, attempts FROM outbox WHERE delivered IS NULL AND dead IS NULL "
+                    "AND (claimed_until IS NULL OR claimed_until < ?) ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                if candidates and candidates[0][1]:
+                    candidates = candidates[:1]
+                ids = [i for i, _ in candidates]
+                if ids:
+                    conn.executemany(
+                        "UPDATE outbox SET claimed_by = ?, claimed_until = ? WHERE id = ?",
+                        [(owner, now + lease, i) for i in ids]
+                    )
+                rows = [(i, json.loads(r)) for i, r in conn.execute(
+                    f"SELECT id, row FROM outbox WHERE id IN ({','.join('?' * len(ids))}) ORDER BY id",
+                    ids
+                )] if ids else []
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return rows
+
+    def mark_delivered(self, ids):
+        with self._lock:
+            now = time.time()
+            self._conn().executemany(
+                "UPDATE outbox SET delivered = ?, claimed_by = NULL, claimed_until = NULL WHERE id = ?",
+                [(now, i) for i in ids]
+            )
+
+    def release(self, ids):
+        with self._lock:
+            self._conn().executemany(
+                "UPDATE outbox SET claimed_by = NULL, claimed_until = NULL WHERE id = ?",
+                [(i,) for i in ids]
+            )
+
+    def fail(self, ids, error, max_attempts):
+        """
+        Releases rows after a non-retryable failure and parks those that
+        have now failed max_attempts times. Returns the number parked.
+        """
+        with self._lock:
+            conn = self._conn()
+            now = time.time()
+            conn.executemany(
+                "UPDATE outbox SET claimed_by = NULL, claimed_until = NULL, "
+                "attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(str(error)[:500], i) for i in ids]
+            )
+            return conn.execute(
+                f"UPDATE outbox SET dead = ? WHERE id IN ({','.join('?' * len(ids))}) "
+                "AND dead IS NULL AND attempts >= ?",
+                [now, *ids, max_attempts]
+            ).rowcount
+
+    def pending(self):
+        """
+        Returns (undelivered row count, creation time of the oldest one),
+        not counting dead letters.
+        """
+        with self._lock:
+            return self._conn().execute(
+                "SELECT COUNT(*), MIN(created) FROM outbox WHERE delivered IS NULL AND dead IS NULL"
+            ).fetchone()
+
+    def dead_letters(self):
+        with self._lock:
+            return self._conn().execute(
+                "SELECT COUNT(*) FROM outbox WHERE dead IS NOT NULL AND delivered IS NULL"
+            ).fetchone()[0]
+
+
+class OutboxQueue:
+    """
+    Same interface as WriteBehindQueue, backed by an Outbox.
+    """
+    def __init__(self, outbox, sink, batch_size=50, flush_interval=2.0,
+                 base_backoff=1.0, max_backoff=60.0, lease=120.0, max_attempts=8):
+        self.outbox = outbox
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        self._force = False
+
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.retries = 0
+
+    def enqueue(self, row):
+        self.outbox.append(row)
+        with self._cond:
+            self.start()
+            self._cond.notify()
+
+    def depth(self):
+        return self.outbox.pending()[0]
+
+    def stats(self):
+        return {
+            'depth': self.depth(),
+            'flushed_rows': self.flushed_rows,
+            'flushed_batches': self.flushed_batches,
+            'retries': self.retries,
+            'dead_letter_rows': self.outbox.dead_letters(),
+        }
+
+    def flush(self, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._force = True
+            self._cond.notify_all()
+        while self.depth():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stop(self, timeout=10.0):
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def start(self):
+        """
+        Starts this process's drainer, which also replays rows left
+        undelivered by earlier processes.
+        """
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='outbox-drainer', daemon=True)
+        self._thread.start()
+
+    def _ready(self):
+        count, oldest = self.outbox.pending()
+        if not count:
+            self._force = False
+            return False
+        return (self._force or count >= self.batch_size
+                or time.time() - oldest >= self.flush_interval)
+
+    def _run(self):
+        owner = f"{os.getpid()}-{threading.get_ident()}"
+        failures = 0
+        while True:
+            with self._cond:
+                while not self._stopping and not self._ready():
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+
+            batch = self.outbox.claim(owner, self.batch_size, self.lease)
+            if not batch:
+                # Everything pending is leased to another worker
+                with self._cond:
+                    self._cond.wait(self.flush_interval)
+                continue
+
+            ids = [i for i, _ in batch]
+            try:
+                self.sink([row for _, row in batch])
+            except Exception as e:
+                # Rows stay in the outbox; nothing is dropped
+                failures += 1
+                self.retries += 1
+                if is_retryable(e):
+                    self.outbox.release(ids)
+                else:
+                    parked = self.outbox.fail(ids, e, self.max_attempts)
+                    logger.error("Outbox delivery of %d rows failed: %s", len(ids), e)
+                    if parked:
+                        logger.error("Parked %d outbox rows as dead letters after %d attempts",
+                                     parked, self.max_attempts)
+                time.sleep(backoff_delay(failures, self.base_backoff, self.max_backoff))
+                continue
+
+            self.outbox.mark_delivered(ids)
+            failures = 0
+            self.flushed_rows += len(ids)
+            self.flushed_batches += 1
+
+
+def create_outbox_queue(app, sink):
+    path = app.config.get('SHEETS_OUTBOX_PATH') or os.path.join(
+        tempfile.gettempdir(), 'riasec_outbox.sqlite3'
+    )
+    outbox = Outbox(path, synchronous=app.config.get('SHEETS_OUTBOX_SYNC', 'NORMAL'))
+    queue = OutboxQueue(
+        outbox,
+        sink,
+        batch_size=app.config.get('SHEETS_BATCH_SIZE', 50),
+        flush_interval=app.config.get('SHEETS_FLUSH_INTERVAL', 2.0),
+    )
+    queue.start()
+    atexit.register(queue.stop)
+    return queue
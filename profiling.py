@@ -0,0 +1,164 @@
+"""
+Opt-in request profiling for production traffic.
+
+With PROFILING_ENABLED on, a PROFILING_SAMPLE_PERCENT share of requests,
+plus any request carrying PROFILING_HEADER set to PROFILING_TOKEN, runs
+under cProfile. Each profile is written to PROFILING_DIR as
+
+    <timestamp>_<endpoint>_<duration>ms_<pid>.prof
+
+(load it with pstats or snakeviz). Only PROFILING_MAX_FILES of the newest
+profiles are kept. /admin/profiles lists them and /admin/profiles/<name>
+downloads one; both require the token in the X-Admin-Token header or a
+?token= query argument.
+
+cProfile can only follow one request per process at a time; a sampled
+request that arrives while another is being profiled runs unprofiled.
+
+cProfile profiles the whole OS thread. Under gevent workers every greenlet
+scheduled while a request is being profiled would land in its profile, so
+profiling switches itself off (with a warning) once it sees gevent's
+monkey-patching. Profile with sync or gthread workers instead.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from flask import abort, g, jsonify, request, send_from_directory
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME_RE = re.compile(r'^[\w.-]+\.prof$')
+
+
+def gevent_patched():
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+class RequestProfiler:
+    def __init__(self, directory, sample_percent=0.0, header='X-Profile', token=None, max_files=200):
+        self.directory = directory
+        self.sample_percent = sample_percent
+        self.header = header
+        self.token = token
+        self.max_files = max_files
+        self._busy = threading.Lock()
+        self.profiled = 0
+        self.skipped = 0
+        self.disabled = False
+        os.makedirs(directory, exist_ok=True)
+
+    def token_matches(self, value):
+        return bool(self.token and value) and hmac.compare_digest(value, self.token)
+
+    def wanted(self):
+        if self.token_matches(request.headers.get(self.header)):
+            return True
+        return self.sample_percent > 0 and random.random() * 100 < self.sample_percent
+
+    def start(self):
+        if self.disabled:
+            return
+        if gevent_patched():
+            # With --preload the gevent worker patches after the app is
+            # imported, so this is checked per request rather than at init
+            self.disabled = True
+            logger.warning("Request profiling disabled: cProfile cannot separate gevent greenlets")
+            return
+        if not self.wanted():
+            return
+        if not self._busy.acquire(blocking=False):
+            self.skipped += 1
+            return
+        profile = cProfile.Profile()
+        g.profile = profile
+        g.profile_started = time.perf_counter()
+        profile.enable()
+
+    def finish(self, exc=None):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        try:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - g.pop('profile_started')) * 1000
+            endpoint = re.sub(r'[^\w-]', '-', request.endpoint or 'unmatched')
+            name = (f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{endpoint}_"
+                    f"{elapsed_ms:.0f}ms_{os.getpid()}.prof")
+            profile.dump_stats(os.path.join(self.directory, name))
+            self.profiled += 1
+        finally:
+            self._busy.release()
+        self.prune()
+
+    def profiles(self):
+        """
+        Saved profiles, newest first, as (name, size in bytes, mtime).
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and PROFILE_NAME_RE.match(entry.name):
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda e: e[2], reverse=True)
+        return entries
+
+    def prune(self):
+        for name, _, _ in self.profiles()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        return {'profiled': self.profiled, 'skipped_busy': self.skipped, 'disabled': self.disabled}
+
+
+def init_profiling(app):
+    if not app.config.get('PROFILING_ENABLED', False):
+        return None
+
+    profiler = RequestProfiler(
+        app.config.get('PROFILING_DIR') or os.path.join(tempfile.gettempdir(), 'riasec_profiles'),
+        sample_percent=app.config.get('PROFILING_SAMPLE_PERCENT', 0.0),
+        header=app.config.get('PROFILING_HEADER', 'X-Profile'),
+        token=app.config.get('PROFILING_TOKEN'),
+        max_files=app.config.get('PROFILING_MAX_FILES', 200),
+    )
+    app.before_request(profiler.start)
+    app.teardown_request(profiler.finish)
+
+    def require_token():
+        supplied = request.headers.get('X-Admin-Token') or request.args.get('token')
+        if not profiler.token_matches(supplied):
+            abort(404)
+
+    @app.route('/admin/profiles')
+    def list_profiles():
+        require_token()
+        return jsonify({
+            'stats': profiler.stats(),
+            'profiles': [
+                {'name': name, 'bytes': size, 'created': datetime.fromtimestamp(mtime).isoformat()}
+                for name, size, mtime in profiler.profiles()
+            ],
+        })
+
+    @app.route('/admin/profiles/<name>')
+    def download_profile(name):
+        require_token()
+        if not PROFILE_NAME_RE.match(name):
+            abort(404)
+        return send_from_directory(profiler.directory, name, as_attachment=True)
+
+    app.extensions['profiler'] = profiler
+    return profiler
@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+from questions.main_questions import QUESTIONS
+from questions.tie_breaker_questions import TIE_BREAKER_QUESTIONS
+
+# -----------------------------
+# Dimensions & Aptitude Mapping
+# -----------------------------
+RIASEC_ORDER = ['R','I','A','S','E','C']
+
+NEW_APTITUDES = [
+    "Logical Reasoning", "Mechanical", "Creative", "Verbal Communication",
+    "Numerical", "Social/Helping", "Leadership/Persuasion", "Digital/Computer",
+    "Organizing/Structuring", "Writing/Expression", "Scientific", "Spatial/Design"
+]
+
+OLD_TO_NEW_APT_MAP = {
+    "Analytical": ["Logical Reasoning"],
+    "Technical": ["Mechanical"],
+    "Spatial": ["Spatial/Design"],
+    "Verbal": ["Verbal Communication"],
+    "Creative": ["Creative"],
+}
+
+RIASEC_INDEX = {code: i for i, code in enumerate(RIASEC_ORDER)}
+APTITUDE_INDEX = {apt: i for i, apt in enumerate(NEW_APTITUDES)}
+ZERO_APTITUDES = (0,) * len(NEW_APTITUDES)
+
+# -----------------------------
+# Compiled Question Bank
+# -----------------------------
+# One entry per (question number, option letter). `riasec` is the dimension
+# the option scores (None if it scores none), `riasec_delta` the weight added
+# to it, and `aptitudes` a vector aligned with NEW_APTITUDES with weights
+# applied and old aptitude keys already remapped.
+CompiledOption = namedtuple('CompiledOption', ['riasec', 'riasec_delta', 'aptitudes'])
+
+
+def compile_aptitudes(option_apts, weight):
+    vector = [0] * len(NEW_APTITUDES)
+    for old_key, score in (option_apts or {}).items():
+        if old_key in OLD_TO_NEW_APT_MAP:
+            targets = OLD_TO_NEW_APT_MAP[old_key]
+        elif old_key in APTITUDE_INDEX:
+            targets = [old_key]
+        else:
+            continue
+        for new_key in targets:
+            vector[APTITUDE_INDEX[new_key]] += int(score) * weight
+    return tuple(vector)
+
+
+def compile_question(question, score_aptitudes=True):
+    weight = question.get('weight', 1)
+    compiled = {}
+    for letter, option in question.get('options', {}).items():
+        riasec = option.get('riasec')
+        if riasec not in RIASEC_INDEX:
+            riasec = None
+        if score_aptitudes:
+            aptitudes = compile_aptitudes(option.get('aptitudes'), weight)
+        else:
+            aptitudes = ZERO_APTITUDES
+        compiled[letter] = CompiledOption(riasec, weight if riasec else 0, aptitudes)
+    return compiled
+
+
+def compile_question_bank(questions=QUESTIONS, tie_breaker_questions=TIE_BREAKER_QUESTIONS):
+    """
+    Builds {question_number: {option_letter: CompiledOption}}.
+    Tie-breaker questions only ever move RIASEC scores, never aptitudes.
+    """
+    bank = {}
+    for q in questions:
+        bank[q['number']] = compile_question(q)
+    for q in tie_breaker_questions:
+        bank.setdefault(q['number'], compile_question(q, score_aptitudes=False))
+    return bank
+
+
+QUESTION_BANK = compile_question_bank()
+QUESTIONS_BY_NUMBER = {q['number']: q for q in TIE_BREAKER_QUESTIONS}
+QUESTIONS_BY_NUMBER.update({q['number']: q for q in QUESTIONS})
+MAIN_TOTAL = len(QUESTIONS)
@@ -0,0 +1,202 @@
+"""
+Offline bulk scoring of exported responses.
+
+    python score_responses.py responses.jsonl -o scored.csv --workers 8
+    python score_responses.py export.csv -o enriched.csv --profile-enrichment
+
+Input is JSONL (one object per line, answers under "answers" or as
+question-number keys) or CSV (one column per question number, e.g. "1" or
+"q1"). Every other field is copied through to the output. Rows are read,
+scored and written in chunks with a bounded number of chunks in flight, so
+memory stays constant regardless of file size; chunks are spread across
+worker processes and written back in input order.
+
+--profile-enrichment adds the keyword boosts of each row's occupation and
+education fields to its aptitudes, as PROFILE_ENRICHMENT does in the app.
+Each worker memoizes boosts by normalized text; the combined cache hit rate
+is reported at the end.
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+from collections import deque
+from multiprocessing import Pool
+
+from enrichment import PROFILE_CACHE, PROFILE_TEXT_FIELDS, profile_enrichment
+from scoring import score_answers, resolve_riasec_code
+from questions.bank import NEW_APTITUDES, RIASEC_ORDER
+
+OUTPUT_SCORE_FIELDS = ['riasec_code'] + RIASEC_ORDER + NEW_APTITUDES
+
+# -----------------------------
+# Reading & Writing
+# -----------------------------
+def question_number(field):
+    key = field.strip().lower()
+    if key.startswith('q'):
+        key = key[1:]
+    return int(key) if key.isdigit() else None
+
+def split_record(record):
+    """
+    Splits a raw record into (answers, passthrough fields).
+    """
+    answers = dict(record.get('answers') or {})
+    extra = {}
+    for field, value in record.items():
+        if field == 'answers':
+            continue
+        qnum = question_number(field)
+        if qnum is None:
+            extra[field] = value
+        elif value not in (None, ''):
+            answers[str(qnum)] = str(value).strip().upper()
+    return answers, extra
+
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+def detect_format(path, default='jsonl'):
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.jsonl', '.json')):
+        return 'jsonl'
+    return default
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def profile_fields(extra):
+    by_name = {str(k).strip().lower(): v for k, v in extra.items()}
+    return {field: by_name.get(field) for field in PROFILE_TEXT_FIELDS}
+
+def score_record(record, use_text_enrichment=False, use_profile_enrichment=False):
+    answers, extra = split_record(record)
+    riasec_scores, aptitude_vector = score_answers(answers, use_text_enrichment)
+    if use_profile_enrichment:
+        for i, boost in enumerate(profile_enrichment(profile_fields(extra))):
+            aptitude_vector[i] += boost
+    out = dict(extra)
+    out['riasec_code'] = resolve_riasec_code(riasec_scores)
+    for code in RIASEC_ORDER:
+        out[code] = riasec_scores[code]
+    out.update(zip(NEW_APTITUDES, aptitude_vector))
+    return out
+
+def score_chunk(args):
+    """
+    Returns the scored rows plus this worker's cache (hits, misses) for the chunk.
+    """
+    records, use_text_enrichment, use_profile_enrichment = args
+    hits, misses = PROFILE_CACHE.hits, PROFILE_CACHE.misses
+    rows = [score_record(r, use_text_enrichment, use_profile_enrichment) for r in records]
+    return rows, PROFILE_CACHE.hits - hits, PROFILE_CACHE.misses - misses
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def score_stream(records, workers=1, chunk_size=1000, use_text_enrichment=False,
+                 use_profile_enrichment=False, cache_stats=None):
+    """
+    Yields scored rows in input order. With workers > 1 at most 2 chunks per
+    worker are queued at any time. Profile cache hits and misses across all
+    workers are added to `cache_stats` when given.
+    """
+    chunks = ((chunk, use_text_enrichment, use_profile_enrichment)
+              for chunk in chunked(records, chunk_size))
+    if cache_stats is None:
+        cache_stats = {}
+
+    def unpack(result):
+        rows, hits, misses = result
+        cache_stats['hits'] = cache_stats.get('hits', 0) + hits
+        cache_stats['misses'] = cache_stats.get('misses', 0) + misses
+        return rows
+
+    if workers <= 1:
+        for args in chunks:
+            yield from unpack(score_chunk(args))
+        return
+
+    with Pool(workers) as pool:
+        window = deque()
+        for args in chunks:
+            window.append(pool.apply_async(score_chunk, (args,)))
+            if len(window) >= workers * 2:
+                yield from unpack(window.popleft().get())
+        while window:
+            yield from unpack(window.popleft().get())
+
+# -----------------------------
+# Main
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score exported RIASEC responses.")
+    parser.add_argument('input', help="CSV or JSONL file, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="CSV or JSONL file, '-' for stdout")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'])
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--text-enrichment', action='store_true',
+                        help="apply enrich_from_text boosts, as calculate_scores(True) does")
+    parser.add_argument('--profile-enrichment', action='store_true',
+                        help="add occupation/education keyword boosts, as PROFILE_ENRICHMENT does")
+    parser.add_argument('--cache-size', type=int, default=PROFILE_CACHE.maxsize,
+                        help="per-worker profile enrichment cache entries")
+    args = parser.parse_args(argv)
+
+    in_fmt = args.input_format or detect_format(args.input)
+    out_fmt = args.output_format or detect_format(args.output)
+
+    src = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+
+    # Workers fork after this, so each starts with an empty cache of this size
+    PROFILE_CACHE.maxsize = args.cache_size
+    cache_stats = {}
+    try:
+        rows = score_stream(read_records(src, in_fmt), args.workers, args.chunk_size,
+                            args.text_enrichment, args.profile_enrichment, cache_stats)
+        count = 0
+        if out_fmt == 'csv':
+            writer = None
+            for row in rows:
+                if writer is None:
+                    extra = [f for f in row if f not in OUTPUT_SCORE_FIELDS]
+                    writer = csv.DictWriter(dst, fieldnames=extra + OUTPUT_SCORE_FIELDS,
+                                            extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                dst.write(json.dumps(row) + '\n')
+                count += 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    print(f"Scored {count} responses", file=sys.stderr)
+    if args.profile_enrichment:
+        lookups = cache_stats.get('hits', 0) + cache_stats.get('misses', 0)
+        rate = cache_stats.get('hits', 0) / lookups if lookups else 0.0
+        print(f"Profile enrichment cache: {cache_stats.get('hits', 0)} hits, "
+              f"{cache_stats.get('misses', 0)} misses ({rate:.1%} hit rate)", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
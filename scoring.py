@@ -0,0 +1,245 @@
+"""
+Pure scoring core: answers mapping + compiled question bank in, scores out.
+
+Nothing here touches Flask, the session or Google APIs, so batch jobs,
+worker processes and benchmarks can import it cheaply. The web routes in
+app.py are thin adapters over these functions.
+"""
+import itertools
+
+from questions.bank import (
+    QUESTION_BANK, MAIN_TOTAL, NEW_APTITUDES, RIASEC_ORDER, RIASEC_INDEX,
+)
+from questions.tie_breaker_questions import TIE_BREAKER_QUESTIONS
+from enrichment import QUESTION_ENRICHMENT
+
+# -----------------------------
+# Score Calculation
+# -----------------------------
+def add_enrichment(aptitude_vector, qnum, sign=1):
+    boosts = QUESTION_ENRICHMENT.get(qnum)
+    if boosts is None:
+        return
+    for i, boost in enumerate(boosts):
+        aptitude_vector[i] += sign * boost
+
+def score_answers(answers, use_text_enrichment=False, bank=QUESTION_BANK):
+    """
+    Scores a full {question_number: option_letter} mapping from scratch.
+    Returns the RIASEC dict and an aptitude vector aligned with NEW_APTITUDES.
+    """
+    riasec_scores = {'R':0,'I':0,'A':0,'S':0,'E':0,'C':0}
+    aptitude_vector = [0] * len(NEW_APTITUDES)
+
+    for qnum_key, selected in answers.items():
+        apply_answer(riasec_scores, aptitude_vector, qnum_key, None, selected,
+                     use_text_enrichment, bank)
+
+    return riasec_scores, aptitude_vector
+
+def apply_answer(riasec_scores, aptitude_vector, qnum_key, old_selected, new_selected,
+                 use_text_enrichment=False, bank=QUESTION_BANK):
+    """
+    Updates running totals in place for one submitted answer.
+    A changed answer first subtracts the previously selected option.
+    """
+    try:
+        qnum = int(qnum_key)
+    except:
+        return
+
+    options = bank.get(qnum, {})
+    old = options.get(old_selected) if old_selected is not None else None
+    new = options.get(new_selected)
+
+    for option, sign in ((old, -1), (new, 1)):
+        if option is None:
+            continue
+
+        # RIASEC scoring
+        if option.riasec:
+            riasec_scores[option.riasec] += sign * option.riasec_delta
+
+        # Aptitude scoring (weights applied, old keys remapped at compile time)
+        for i, delta in enumerate(option.aptitudes):
+            aptitude_vector[i] += sign * delta
+
+    # Text boosts depend on the question, not the option picked
+    if use_text_enrichment and qnum <= MAIN_TOTAL and (old is None) != (new is None):
+        add_enrichment(aptitude_vector, qnum, 1 if new is not None else -1)
+
+# -----------------------------
+# Tie-breaker Logic
+# -----------------------------
+MAX_TIE_BREAKER_QS = 3
+DEFAULT_TIE_BREAKER_DELTA = 2
+DEFAULT_TIE_BREAKER_DEPTH = 3
+
+# Pair keys are "X-Y" with X before Y in RIASEC order, as in the question
+# table. PAIR_KEYS maps either orientation to that key; PAIR_RANK is the
+# resolver ordering of every key, including reversed ones found in older
+# sessions.
+PAIR_KEYS = {
+    (a, b): f"{a}-{b}" if RIASEC_INDEX[a] < RIASEC_INDEX[b] else f"{b}-{a}"
+    for a in RIASEC_ORDER for b in RIASEC_ORDER if a != b
+}
+PAIR_RANK = {
+    f"{a}-{b}": (RIASEC_INDEX[a], RIASEC_INDEX[b])
+    for a in RIASEC_ORDER for b in RIASEC_ORDER if a != b
+}
+
+def build_tie_breaker_table(questions=TIE_BREAKER_QUESTIONS, limit=MAX_TIE_BREAKER_QS):
+    """
+    pair key -> the first `limit` tie-breaker questions for that pair.
+    """
+    table = {}
+    for q in questions:
+        a, b = q['pair'].split('-')
+        table.setdefault(PAIR_KEYS[a, b], [])
+        if len(table[PAIR_KEYS[a, b]]) < limit:
+            table[PAIR_KEYS[a, b]].append(q)
+    return {pair: tuple(qs) for pair, qs in table.items()}
+
+TIE_BREAKERS_BY_PAIR = build_tie_breaker_table()
+
+def normalize_pair(pair):
+    a, b = pair.split('-')
+    return PAIR_KEYS[a, b]
+
+def sort_pairs_resolver_style(pairs):
+    return sorted(pairs, key=PAIR_RANK.__getitem__)
+
+def identify_tie_pairs(riasec_scores, delta=DEFAULT_TIE_BREAKER_DELTA, depth=DEFAULT_TIE_BREAKER_DEPTH):
+    """
+    Pairs of adjacent dimensions among the top `depth` whose scores differ
+    by less than `delta`. One ranking pass, so a run of several tied
+    dimensions yields every adjacent pair in it.
+    """
+    # Sorting is stable (also in reverse), so equal scores keep resolver order
+    ranked = sorted(RIASEC_ORDER, key=riasec_scores.__getitem__, reverse=True)[:depth]
+    return {
+        PAIR_KEYS[hi, lo]
+        for hi, lo in zip(ranked, ranked[1:])
+        if riasec_scores[hi] - riasec_scores[lo] < delta
+    }
+
+def get_questions_for_pairs(pairs, already_asked):
+    asked = {normalize_pair(p) for p in already_asked}
+    new_qs = []
+    for pair in pairs:
+        pair = normalize_pair(pair)
+        if pair not in asked:
+            new_qs.extend(TIE_BREAKERS_BY_PAIR.get(pair, ()))
+    return new_qs
+
+# -----------------------------
+# Adaptive Tie-breakers
+# -----------------------------
+# Instead of queueing every question of every tied pair up front, adaptive
+# mode asks one question at a time and re-checks after each answer. It stops
+# as soon as every possible outcome of the questions the up-front mode would
+# still ask yields the same code, so both modes always agree on the result.
+# Questions come from the first pair whose own order is still open.
+def remaining_questions(pair, asked):
+    return [q['number'] for q in TIE_BREAKERS_BY_PAIR.get(pair, ()) if q['number'] not in asked]
+
+def pair_decided(riasec_scores, pair, remaining):
+    """
+    True if `remaining` more answers cannot flip the pair's order. Equal
+    scores resolve to the dimension earlier in RIASEC order.
+    """
+    first, second = pair.split('-')
+    margin = riasec_scores[first] - riasec_scores[second]
+    return margin >= remaining or margin < -remaining
+
+def possible_codes(riasec_scores, remaining_by_pair):
+    """
+    Every code reachable by splitting each pair's remaining answers
+    between its two dimensions.
+    """
+    pairs = [(p.split('-'), n) for p, n in remaining_by_pair.items() if n]
+    codes = set()
+    for split in itertools.product(*(range(n + 1) for _, n in pairs)):
+        scores = dict(riasec_scores)
+        for ((first, second), n), to_first in zip(pairs, split):
+            scores[first] += to_first
+            scores[second] += n - to_first
+        codes.add(resolve_riasec_code(scores))
+    return codes
+
+def next_tie_breaker(riasec_scores, pending_pairs, asked):
+    """
+    Returns (next question number or None when done, pairs with questions left).
+    """
+    asked = set(asked)
+    remaining = {p: remaining_questions(p, asked) for p in pending_pairs}
+    pending = [p for p in pending_pairs if remaining[p]]
+    if not pending or len(possible_codes(riasec_scores, {p: len(remaining[p]) for p in pending})) == 1:
+        return None, []
+    open_pairs = [p for p in pending if not pair_decided(riasec_scores, p, len(remaining[p]))]
+    return remaining[(open_pairs or pending)[0]][0], pending
+
+# -----------------------------
+# Adaptive Main Phase
+# -----------------------------
+# The phase is locked once no combination of answers to the remaining main
+# questions can change the code or the tie-breakers it leads to: the top
+# `depth` dimensions keep their order with every adjacent margin at least
+# the tie-breaker delta, so no completion queues any tie-breaker and the
+# final code is the one the full phase would give. Each question moves the
+# margin between two dimensions independently of the others, so the worst
+# case of every margin is exact: the sum of the current margin and each
+# remaining question's least favourable option.
+def option_riasec_rows(bank=QUESTION_BANK):
+    """
+    qnum -> one RIASEC delta row per option.
+    """
+    return {
+        qnum: tuple(
+            tuple(o.riasec_delta if o.riasec == code else 0 for code in RIASEC_ORDER)
+            for o in options.values()
+        )
+        for qnum, options in bank.items()
+    }
+
+OPTION_RIASEC_ROWS = option_riasec_rows()
+
+def worst_margin(riasec_scores, first, second, remaining, rows=OPTION_RIASEC_ROWS):
+    i, j = RIASEC_INDEX[first], RIASEC_INDEX[second]
+    margin = riasec_scores[first] - riasec_scores[second]
+    for qnum in remaining:
+        margin += min(row[i] - row[j] for row in rows[qnum])
+    return margin
+
+def always_before(riasec_scores, first, second, remaining, rows=OPTION_RIASEC_ROWS):
+    margin = worst_margin(riasec_scores, first, second, remaining, rows)
+    return margin > 0 or (margin == 0 and RIASEC_INDEX[first] < RIASEC_INDEX[second])
+
+def code_locked(riasec_scores, remaining, rows=OPTION_RIASEC_ROWS,
+                delta=DEFAULT_TIE_BREAKER_DELTA, depth=DEFAULT_TIE_BREAKER_DEPTH):
+    """
+    True if, whatever the answers to the `remaining` question numbers,
+    resolve_riasec_code gives the same code and identify_tie_pairs(delta,
+    depth) finds no pair, so stopping now cannot change the final result.
+    """
+    remaining = list(remaining)
+    ranked = sorted(RIASEC_ORDER, key=riasec_scores.__getitem__, reverse=True)
+    fixed = max(3, depth)
+    top, rest = ranked[:fixed], ranked[fixed:]
+    for k, (first, second) in enumerate(zip(top, top[1:])):
+        if not always_before(riasec_scores, first, second, remaining, rows):
+            return False
+        if k + 1 < depth and worst_margin(riasec_scores, first, second, remaining, rows) < delta:
+            return False
+    return all(always_before(riasec_scores, top[-1], other, remaining, rows) for other in rest)
+
+# -----------------------------
+# RIASEC Resolver
+# -----------------------------
+def resolve_riasec_code(riasec_scores):
+    sorted_scores = sorted(
+        riasec_scores.items(),
+        key=lambda x: (-x[1], RIASEC_INDEX[x[0]])
+    )
+    top3 = [code for code, score in sorted_scores[:3]]
+    return ''.join(top3)
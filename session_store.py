@@ -0,0 +1,298 @@
+"""
+Server-side sessions: the cookie carries only a signed opaque id and the
+assessment state lives in a pluggable store.
+
+SESSION_TYPE selects the backend:
+    cookie      Flask's default signed-cookie session (no server state)
+    memory      in-process LRU, for the dev server
+    sqlite      SQLite in WAL mode, shared by all workers on one node
+    redis       any Redis-protocol server, for multi-instance deployments
+'filesystem' is accepted as an alias for 'sqlite'.
+"""
+from collections import OrderedDict
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+from werkzeug.exceptions import HTTPException
+
+from metrics import SESSION_BYTES
+
+SESSIONLESS_ENDPOINTS = ('static', 'asset')
+
+# -----------------------------
+# Stores
+# -----------------------------
+class SessionStore:
+    """
+    Byte-oriented key/value store with per-key expiry. `shared` stores are
+    visible to every worker (and, for Redis, every instance).
+    """
+    name = 'store'
+    shared = False
+
+    def get(self, sid):
+        raise NotImplementedError
+
+    def set(self, sid, data, ttl):
+        raise NotImplementedError
+
+    def delete(self, sid):
+        raise NotImplementedError
+
+
+class MemoryStore(SessionStore):
+    name = 'memory'
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            data, expires = entry
+            if expires <= time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return data
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._data[sid] = (data, time.time() + ttl)
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SqliteStore(SessionStore):
+    name = 'sqlite'
+    shared = True
+    PURGE_EVERY = 500
+
+    def __init__(self, path):
+        self.path = path
+        # One connection per process behind a lock. Under gevent workers a
+        # threading.local is per greenlet, which would mean a new connection
+        # (and journal_mode pragma) on every request.
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._writes = 0
+        with self._lock:
+            conn = self._conn()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)")
+
+    def _conn(self):
+        # Gunicorn forks workers; a connection must not cross the fork
+        if self._connection is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._connection = conn
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, sid):
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires > ?", (sid, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, data, ttl):
+        now = time.time()
+        with self._lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)",
+                (sid, data, now + ttl)
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+
+    def delete(self, sid):
+        with self._lock:
+            self._conn().execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+
+class RedisStore(SessionStore):
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url, key_prefix='session:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_TYPE 'redis' requires the redis package.")
+        self.client = redis.Redis.from_url(url)
+        self.key_prefix = key_prefix
+
+    def get(self, sid):
+        return self.client.get(self.key_prefix + sid)
+
+    def set(self, sid, data, ttl):
+        self.client.setex(self.key_prefix + sid, max(1, int(ttl)), data)
+
+    def delete(self, sid):
+        self.client.delete(self.key_prefix + sid)
+
+# -----------------------------
+# Flask Session Interface
+# -----------------------------
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+
+    # Tracks reads like Flask's SecureCookieSession, so responses that never
+    # looked at the session do not get Vary: Cookie
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    serializer = session_json_serializer
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-side-session')
+
+    def _ttl(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def skips_store(self, app, request):
+        """
+        Static and fingerprinted asset requests never use the session, so
+        they do not pay for a store read.
+        """
+        try:
+            endpoint, _ = app.create_url_adapter(request).match()
+        except HTTPException:
+            return False
+        return endpoint in SESSIONLESS_ENDPOINTS
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie and not self.skips_store(app, request):
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.get(sid)
+                if data is not None:
+                    try:
+                        return ServerSideSession(self.serializer.loads(data), sid=sid)
+                    except ValueError:
+                        pass
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Checked first: reading session.permanent below counts as an access
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(
+                    name,
+                    domain=domain,
+                    path=path,
+                    secure=self.get_cookie_secure(app),
+                    httponly=self.get_cookie_httponly(app),
+                    samesite=self.get_cookie_samesite(app),
+                )
+            return
+
+        if session.modified:
+            data = self.serializer.dumps(dict(session))
+            self.store.set(session.sid, data, self._ttl(app))
+            SESSION_BYTES.observe(len(data), store=self.store.name)
+
+        # Only the opaque id goes back to the browser, and only when it changes
+        if session.new or (session.permanent and app.config['SESSION_REFRESH_EACH_REQUEST']):
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid).decode(),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def create_session_store(app):
+    session_type = app.config.get('SESSION_TYPE', 'cookie')
+
+    if session_type == 'memory':
+        return MemoryStore(app.config.get('SESSION_MEMORY_MAX_ENTRIES', 10000))
+    if session_type in ('sqlite', 'filesystem'):
+        path = app.config.get('SESSION_SQLITE_PATH') or os.path.join(
+            tempfile.gettempdir(), 'riasec_sessions.sqlite3'
+        )
+        return SqliteStore(path)
+    if session_type == 'redis':
+        url = app.config.get('SESSION_REDIS_URL')
+        if not url:
+            raise RuntimeError("SESSION_TYPE 'redis' requires SESSION_REDIS_URL.")
+        return RedisStore(url, app.config.get('SESSION_KEY_PREFIX', 'session:'))
+    if session_type == 'cookie':
+        return None
+    raise RuntimeError(f"Unknown SESSION_TYPE: {session_type}")
+
+
+def init_session(app):
+    """
+    Installs the server-side session interface selected by SESSION_TYPE.
+    Returns the store, or None when Flask's cookie session stays in place.
+    """
+    store = create_session_store(app)
+    if store is not None:
+        app.session_interface = ServerSideSessionInterface(store)
+    app.extensions['session_store'] = store
+    return store
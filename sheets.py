@@ -0,0 +1,145 @@
+import os
+import json
+import threading
+import traceback
+
+import gspread
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
+from google.oauth2.service_account import Credentials
+
+from metrics import SHEETS_CALL_SECONDS
+
+# -----------------------------
+# Google Sheets config
+# -----------------------------
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+SHEET_NAME = "R1"
+
+# Errors after which the cached client/worksheet is dropped and re-opened
+REOPEN_STATUS_CODES = (401, 403, 404)
+
+# -----------------------------
+# Load Google SA Key From ENV
+# -----------------------------
+def get_gspread_client():
+    """
+    Loads the Google Service Account KEY from environment variable GCP_SA_KEY.
+    GCP_SA_KEY must contain FULL minified JSON (one line).
+    """
+    raw = os.environ.get("GCP_SA_KEY")
+    if not raw:
+        raise RuntimeError("ERROR: GCP_SA_KEY environment variable missing.")
+
+    try:
+        info = json.loads(raw)
+    except Exception as e:
+        raise RuntimeError(f"GCP_SA_KEY JSON parse failed: {e}")
+
+    try:
+        creds = Credentials.from_service_account_info(info, scopes=SCOPE)
+        client = gspread.authorize(creds)
+        return client
+    except Exception as e:
+        tb = traceback.format_exc()
+        raise RuntimeError(f"Failed to initialize Google credentials: {e}\n{tb}")
+
+# -----------------------------
+# Process-wide Client Cache
+# -----------------------------
+def is_stale_handle_error(error):
+    if isinstance(error, RuntimeError) and error.__cause__ is not None:
+        # worksheet() wraps failures to open the sheet
+        return is_stale_handle_error(error.__cause__)
+    if isinstance(error, (SpreadsheetNotFound, WorksheetNotFound)):
+        return True
+    return isinstance(error, APIError) and error.code in REOPEN_STATUS_CODES
+
+
+class SheetsClientCache:
+    """
+    Keeps one authorized client and one worksheet handle per process.
+
+    The client's session refreshes its OAuth token by itself when it expires,
+    so a save normally costs a single append request. Auth and not-found
+    errors drop the cached handles and the call is retried once on a fresh
+    client and worksheet.
+    """
+    def __init__(self, sheet_name=SHEET_NAME, client_factory=get_gspread_client):
+        self.sheet_name = sheet_name
+        self.client_factory = client_factory
+        self._lock = threading.Lock()
+        self._client = None
+        self._worksheet = None
+        self.hits = 0
+        self.misses = 0
+        self.reopens = 0
+
+    def worksheet(self):
+        with self._lock:
+            if self._worksheet is not None:
+                self.hits += 1
+                return self._worksheet
+
+            self.misses += 1
+            if self._client is None:
+                with SHEETS_CALL_SECONDS.time(operation='auth'):
+                    self._client = self.client_factory()
+            try:
+                with SHEETS_CALL_SECONDS.time(operation='open'):
+                    self._worksheet = self._client.open(self.sheet_name).sheet1
+            except Exception as e:
+                raise RuntimeError(f"Failed to open Google Sheet: {e}") from e
+            return self._worksheet
+
+    def invalidate(self):
+        with self._lock:
+            self._client = None
+            self._worksheet = None
+            self.reopens += 1
+
+    def call(self, method, *args, **kwargs):
+        """
+        Calls a worksheet method, re-opening once on a stale handle.
+        """
+        try:
+            worksheet = self.worksheet()
+            with SHEETS_CALL_SECONDS.time(operation=method):
+                return getattr(worksheet, method)(*args, **kwargs)
+        except Exception as e:
+            if not is_stale_handle_error(e):
+                raise
+            self.invalidate()
+        worksheet = self.worksheet()
+        with SHEETS_CALL_SECONDS.time(operation=method):
+            return getattr(worksheet, method)(*args, **kwargs)
+
+    def append_row(self, row):
+        return self.call('append_row', row)
+
+    def append_rows(self, rows):
+        return self.call('append_rows', rows)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'reopens': self.reopens}
+
+
+SHEETS = SheetsClientCache()
+
+
+def configure_sheets(app, cache=SHEETS):
+    """
+    Points the cache at the backend selected by SHEETS_BACKEND.
+    """
+    backend = app.config.get('SHEETS_BACKEND', 'google')
+    if backend == 'google':
+        cache.client_factory = get_gspread_client
+    elif backend == 'fake':
+        from fake_sheets import create_fake_client
+        client = create_fake_client(app.config)
+        cache.client_factory = lambda: client
+    else:
+        raise RuntimeError(f"Unknown SHEETS_BACKEND: {backend}")
+    with cache._lock:
+        cache._client = None
+        cache._worksheet = None
+    return cache
@@ -0,0 +1,71 @@
+const page = document.body.dataset;
+let currentQuestionNumber = parseInt(page.questionNumber, 10);
+
+function renderLiveScores(data) {
+    if(data.success) {
+        const riasecDiv = document.getElementById("riasec-scores");
+        const aptDiv = document.getElementById("aptitude-scores");
+
+        let riasecHtml = "<strong>RIASEC Top 3:</strong> ";
+        data.top_riasec.forEach(([code, score]) => {
+            riasecHtml += `${code} (${score}) `;
+        });
+        riasecDiv.innerHTML = riasecHtml;
+
+        let aptHtml = "<strong>Aptitudes:</strong> ";
+        data.top_aptitudes.forEach(([apt, score]) => {
+            aptHtml += `${apt} (${score}) `;
+        });
+        aptDiv.innerHTML = aptHtml;
+    }
+}
+
+function updateLiveScores() {
+    fetch("/get_live_scores")
+        .then(res => res.json())
+        .then(renderLiveScores);
+}
+
+function selectOption(answer, riasec) {
+    const loadingOverlay = document.getElementById('loadingOverlay');
+    loadingOverlay.style.display = 'flex';
+
+    document.querySelectorAll('.option-card').forEach(card => card.classList.remove('selected'));
+    event.currentTarget.classList.add('selected');
+
+    fetch('/save_answer', {
+        method:'POST',
+        headers:{'Content-Type':'application/json'},
+        body: JSON.stringify({question_number: currentQuestionNumber, answer: answer})
+    })
+    .then(res=>res.json())
+    .then(data=>{
+        if(data.success){
+            window.location.href = data.redirect;
+        } else {
+            loadingOverlay.style.display='none';
+            alert('Error saving answer. Please try again.');
+        }
+    })
+    .catch(err=>{
+        loadingOverlay.style.display='none';
+        alert('Error saving answer. Please try again.');
+    });
+}
+
+document.addEventListener('keydown', function(event){
+    if(event.key >= '1' && event.key <= '9'){
+        const options = document.querySelectorAll('.option-card');
+        const index = parseInt(event.key)-1;
+        if(options[index]) options[index].click();
+    }
+});
+
+// Scores are pushed when an answer changes them; poll only without SSE
+if (window.EventSource) {
+    const liveScores = new EventSource(page.liveScoresUrl);
+    liveScores.onmessage = event => renderLiveScores(JSON.parse(event.data));
+} else {
+    updateLiveScores();
+    setInterval(updateLiveScores, 3000);
+}
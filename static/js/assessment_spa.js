@@ -0,0 +1,143 @@
+const page = document.body.dataset;
+const SAVE_URL = page.saveUrl;
+const BATCH_SIZE = parseInt(page.batchSize, 10);
+const FLUSH_INTERVAL_MS = parseFloat(page.flushInterval) * 1000;
+
+let state = JSON.parse(document.getElementById('assessment-state').textContent);
+let index = 0;
+let pending = [];
+let inFlight = Promise.resolve(state);
+
+function renderLiveScores(data) {
+    if(data && data.success) {
+        const riasecDiv = document.getElementById("riasec-scores");
+        const aptDiv = document.getElementById("aptitude-scores");
+
+        let riasecHtml = "<strong>RIASEC Top 3:</strong> ";
+        data.top_riasec.forEach(([code, score]) => {
+            riasecHtml += `${code} (${score}) `;
+        });
+        riasecDiv.innerHTML = riasecHtml;
+
+        let aptHtml = "<strong>Aptitudes:</strong> ";
+        data.top_aptitudes.forEach(([apt, score]) => {
+            aptHtml += `${apt} (${score}) `;
+        });
+        aptDiv.innerHTML = aptHtml;
+    }
+}
+
+function renderQuestion() {
+    const q = state.questions[index];
+    const current = state.answered + index + 1;
+    const percent = (current / state.total_questions) * 100;
+
+    document.title = `Question ${q.number} - RIASEC Assessment`;
+    document.getElementById('progress-label').textContent = `Question ${current} of ${state.total_questions}`;
+    document.getElementById('progress-percent').textContent = `${Math.round(percent)}% Complete`;
+    document.getElementById('progress-fill').style.width = `${percent}%`;
+    document.getElementById('phase-indicator').style.display = state.phase === 'tie_breaker' ? 'inline-block' : 'none';
+    document.getElementById('question-text').textContent = q.question;
+
+    const grid = document.getElementById('options-grid');
+    grid.innerHTML = '';
+    Object.entries(q.options).forEach(([key, option]) => {
+        const card = document.createElement('div');
+        card.className = 'option-card';
+        card.innerHTML = '<div class="option-content"><div class="option-letter"></div><div class="option-text"></div></div><span class="riasec-badge"></span>';
+        card.querySelector('.option-letter').textContent = key;
+        card.querySelector('.option-text').textContent = option.text;
+        card.querySelector('.riasec-badge').textContent = option.riasec;
+        card.addEventListener('click', () => selectOption(q.number, key));
+        grid.appendChild(card);
+    });
+}
+
+// Flushes run one after another so the server sees answers in order
+function flush() {
+    inFlight = inFlight.catch(() => null).then(() => {
+        const batch = pending.splice(0);
+        return fetch(SAVE_URL, {
+            method:'POST',
+            headers:{'Content-Type':'application/json'},
+            body: JSON.stringify({answers: batch})
+        })
+        .then(res => res.json())
+        .then(data => {
+            if(!data.success) throw new Error(data.msg);
+            renderLiveScores(data.scores);
+            // The server can end a phase early (adaptive mode)
+            if (data.done || data.phase !== state.phase) advanceTo(data);
+            return data;
+        })
+        .catch(err => {
+            pending = batch.concat(pending);
+            throw err;
+        });
+    });
+    return inFlight;
+}
+
+function selectOption(questionNumber, answer) {
+    pending.push({question_number: questionNumber, answer: answer});
+    index += 1;
+
+    if (index < state.questions.length) {
+        if (pending.length >= BATCH_SIZE) flush().catch(() => null);
+        renderQuestion();
+    } else {
+        finishPhase();
+    }
+}
+
+function advanceTo(data) {
+    if (data.done) {
+        window.location.href = data.redirect;
+        return;
+    }
+    // Answers still queued belong to the phase that just ended
+    pending = [];
+    state = data;
+    index = 0;
+    document.getElementById('loadingOverlay').style.display = 'none';
+    renderQuestion();
+}
+
+// End of a phase: the server scores the batch and decides what comes next
+function finishPhase() {
+    const loadingOverlay = document.getElementById('loadingOverlay');
+    loadingOverlay.style.display = 'flex';
+
+    flush()
+    .then(data => {
+        if (data === state) return;
+        advanceTo(data);
+    })
+    .catch(err => {
+        loadingOverlay.style.display = 'none';
+        alert('Error saving answers. Please try again.');
+        index -= 1;
+        pending.pop();
+        renderQuestion();
+    });
+}
+
+setInterval(() => { if (pending.length) flush().catch(() => null); }, FLUSH_INTERVAL_MS);
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden' && pending.length) {
+        const body = new Blob([JSON.stringify({answers: pending})], {type: 'application/json'});
+        if (navigator.sendBeacon(SAVE_URL, body)) pending = [];
+    }
+});
+
+document.addEventListener('keydown', function(event){
+    if(event.key >= '1' && event.key <= '9'){
+        const options = document.querySelectorAll('.option-card');
+        const index = parseInt(event.key)-1;
+        if(options[index]) options[index].click();
+    }
+});
+
+renderLiveScores(state.scores);
+renderQuestion();
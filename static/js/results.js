@@ -0,0 +1,11 @@
+document.getElementById('saveBtn').addEventListener('click', function() {
+    fetch(document.body.dataset.saveUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+    })
+    .then(res => res.json())
+    .then(data => {
+        alert(data.msg);
+    })
+    .catch(err => alert('Error saving results.'));
+});
@@ -0,0 +1,92 @@
+"""
+Template compilation and question fragment caching.
+
+init_template_cache(app) gives Jinja a FileSystemBytecodeCache, so a cold
+worker loads compiled templates from TEMPLATE_BYTECODE_CACHE_DIR instead of
+parsing them, and compiles every template at startup so the first request
+for each page does not pay for it.
+
+A question card (question text and option cards) is identical for every
+respondent, so QuestionFragments renders question_card.html once per
+(question number, phase) and assessment.html interpolates only the progress
+counters around it. With TEMPLATES_AUTO_RELOAD on (off by default, also
+under DEBUG), templates are re-checked and cards rendered on every request
+so template edits show up.
+"""
+import os
+import tempfile
+
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+FRAGMENT_TEMPLATE = 'question_card.html'
+
+
+class QuestionFragments:
+    def __init__(self, env, questions, template=FRAGMENT_TEMPLATE, reload=False):
+        self.env = env
+        self.questions = questions
+        self.template = template
+        self.reload = reload
+        self._fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, qnum, phase):
+        html = self.env.get_template(self.template).render(
+            question=self.questions[qnum], phase=phase
+        )
+        return Markup(html)
+
+    def get(self, qnum, phase):
+        if self.reload:
+            return self.render(qnum, phase)
+        key = (qnum, phase)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            # Racing threads render the same markup; either result may win
+            self.misses += 1
+            fragment = self._fragments[key] = self.render(qnum, phase)
+        else:
+            self.hits += 1
+        return fragment
+
+    def warm(self, keys):
+        for qnum, phase in keys:
+            self.get(qnum, phase)
+
+    def stats(self):
+        return {'fragments': len(self._fragments), 'hits': self.hits, 'misses': self.misses}
+
+
+def precompile_templates(env):
+    """
+    Loads every template so it is compiled (and written to the bytecode
+    cache) before the first request. Returns the number loaded.
+    """
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def init_template_cache(app, questions, fragment_keys=()):
+    env = app.jinja_env
+    directory = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+    if directory != '':
+        directory = directory or os.path.join(tempfile.gettempdir(), 'riasec_jinja_cache')
+        os.makedirs(directory, exist_ok=True)
+        env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+    if app.config.get('TEMPLATE_PREWARM', True):
+        precompile_templates(env)
+
+    # Explicit setting: DEBUG alone must not switch the caches off
+    reload = bool(app.config.get('TEMPLATES_AUTO_RELOAD'))
+    env.auto_reload = reload
+    fragments = QuestionFragments(env, questions, reload=reload)
+    if app.config.get('TEMPLATE_PREWARM', True) and not reload:
+        fragments.warm(fragment_keys)
+
+    app.extensions['question_fragments'] = fragments
+    return fragments
@@ -0,0 +1,169 @@
+"""
+Write-behind queue for result rows.
+
+/save_results enqueues the row and returns; a background flusher coalesces
+pending rows into append_rows batches, flushing when a batch fills up or the
+oldest pending row has waited flush_interval seconds. Quota and transient
+errors are retried with exponential backoff.
+"""
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from gspread.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def is_retryable(error):
+    if isinstance(error, RuntimeError) and error.__cause__ is not None:
+        # SheetsClientCache wraps failures to open the sheet
+        return is_retryable(error.__cause__)
+    if isinstance(error, APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def backoff_delay(attempt, base, maximum):
+    return min(maximum, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+class WriteBehindQueue:
+    def __init__(self, sink, batch_size=50, flush_interval=2.0,
+                 base_backoff=1.0, max_backoff=60.0, max_attempts=8):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        self._pending = deque()
+        self._oldest = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._in_flight = 0
+        self._stopping = False
+
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.retries = 0
+        self.dropped_rows = 0
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def enqueue(self, row):
+        with self._cond:
+            self._ensure_thread()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(row)
+            self._cond.notify()
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending) + self._in_flight
+
+    def stats(self):
+        return {
+            'depth': self.depth(),
+            'flushed_rows': self.flushed_rows,
+            'flushed_batches': self.flushed_batches,
+            'retries': self.retries,
+            'dropped_rows': self.dropped_rows,
+        }
+
+    def flush(self, timeout=30.0):
+        """
+        Waits until everything enqueued so far has been written or dropped.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._oldest = 0 if self._pending else self._oldest
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=30.0):
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    # -----------------------------
+    # Flusher thread
+    # -----------------------------
+    def _ensure_thread(self):
+        # Gunicorn forks workers; each process needs its own flusher
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while True:
+                if self._stopping and not self._pending:
+                    return None
+                if self._pending:
+                    waited = time.monotonic() - self._oldest
+                    if len(self._pending) >= self.batch_size or waited >= self.flush_interval:
+                        break
+                    self._cond.wait(self.flush_interval - waited)
+                else:
+                    self._cond.wait()
+
+            count = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._in_flight = count
+            self._oldest = time.monotonic() if self._pending else None
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.sink(batch)
+                self.flushed_rows += len(batch)
+                self.flushed_batches += 1
+                return
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_attempts:
+                    logger.error("Dropping %d result rows after %d attempts: %s", len(batch), attempt, e)
+                    self.dropped_rows += len(batch)
+                    return
+                self.retries += 1
+                time.sleep(backoff_delay(attempt, self.base_backoff, self.max_backoff))
+
+
+def create_write_behind_queue(app, sink):
+    queue = WriteBehindQueue(
+        sink,
+        batch_size=app.config.get('SHEETS_BATCH_SIZE', 50),
+        flush_interval=app.config.get('SHEETS_FLUSH_INTERVAL', 2.0),
+    )
+    atexit.register(queue.stop)
+    return queue